@@ -1,7 +1,7 @@
 """
 Fill in your bot credentials and copy this file to "config.py"
 """
-from types import SimpleNamespace
+from dataclasses import dataclass
 
 # Discord bot account
 discord_app_token = ""
@@ -11,29 +11,33 @@ discord_bot_account_name = ""
 db_connection_string = "pfltk.db" # A local SQLite3 file by default
 
 # # # Server-specific API addresses roots
-war_api_roots = SimpleNamespace()
+@dataclass(frozen=True, slots=True)
+class WarApiRoots:
+    # Able URL
+    live_1: str = 'https://war-service-live.foxholeservices.com/api/worldconquest/'
 
-# Able URL
-war_api_roots.live_1 = 'https://war-service-live.foxholeservices.com/api/worldconquest/'
+    # Bravo URL
+    live_2: str = 'https://war-service-live-2.foxholeservices.com/api/worldconquest/'
 
-# Bravo URL
-war_api_roots.live_2 = 'https://war-service-live-2.foxholeservices.com/api/worldconquest/'
+    # Charlie URL
+    live_3: str = 'https://war-service-live-3.foxholeservices.com/api/worldconquest/'
 
-# Charlie URL
-war_api_roots.live_3 = 'https://war-service-live-3.foxholeservices.com/api/worldconquest/'
+    # Dev server URL
+    dev: str = 'https://war-service-dev.foxholeservices.com/api/worldconquest/'
 
-# Dev server URL
-war_api_roots.dev = 'https://war-service-dev.foxholeservices.com/api/worldconquest/'
+    # Which of these links the app should use
+    selected: str = live_1
 
-# Which of these links the app should use
-war_api_roots.selected = war_api_roots.live_1
+war_api_roots = WarApiRoots()
 
 # # # API Endpoint Suffixes
-war_api_endpoints = SimpleNamespace()
+@dataclass(frozen=True, slots=True)
+class WarApiEndpoints:
+    war: str = "war/"
+    maps: str = "maps/"
 
-war_api_endpoints.war = "war/"
-war_api_endpoints.maps = "maps/"
+    # Static and Dynamic data endpoints should have their map name formatted in
+    static_map_data: str = 'maps/{map_name}/static/'
+    dynamic_map_data: str = 'maps/{map_name}/dynamic/public'
 
-# Static and Dynamic data endpoints should have their map name formatted in
-war_api_endpoints.static_map_data = 'maps/{map_name}/static/'
-war_api_endpoints.dynamic_map_data = 'maps/{map_name}/dynamic/public'
\ No newline at end of file
+war_api_endpoints = WarApiEndpoints()
\ No newline at end of file
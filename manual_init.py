@@ -3,8 +3,13 @@ Manually kick starts the cold boot process and initializes the app.
 Useful for testing purposes and when there's issues with Discord.
 """
 
+import logging
 from src import initialization
 from config import db_connection_string
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
     initialization.execute_cold_start(db_connection_string)
\ No newline at end of file
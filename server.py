@@ -8,13 +8,16 @@ from GitHub, make a copy of 'config_template.py' populated
 with your own bot account token and so on.
 """
 
+import asyncio
 import discord
 import config
-from logging import Logger
+import logging
+from src import commands, db
+from src.commands import UnsupportedVerbException
 from datetime import datetime
 
 # Set up logging
-log = Logger("PFL-TK Log")
+log = logging.getLogger("pfltk")
 
 # Get the bot's token and name from the config file
 token = config.discord_app_token
@@ -25,35 +28,78 @@ intents = discord.Intents.default()
 intents.message_content = True
 
 
+# Messages beginning with one of these are recorded as commands
+COMMAND_PREFIXES = ("!", "/")
+
+# Reply sent back for each message the bot hears
+ECHO_TEMPLATE = "Message heard from author %s. You said:\n%s"
+
+
 class PFLTK_DiscordClient(discord.Client):
+    # Batches incoming commands into the DB; started once the client is ready
+    command_writer: db.CommandWriter | None = None
+
     async def on_ready(self):
-        message = f"PFL-TK Client for bot {own_name} launched"
-        log.info(message)
+        if self.command_writer is None:
+            self.command_writer = db.CommandWriter(
+                db.DB(config.db_connection_string))
+            self.command_writer.start()
+
+        log.info("PFL-TK Client for bot %s launched", own_name)
+
+    async def close(self):
+        # Write out any commands still waiting in the queue before exiting
+        if self.command_writer is not None:
+            await self.command_writer.close()
+            self.command_writer = None
+
+        await super().close()
 
     async def on_message(self, message: discord.Message):
-        if message.author != own_name:
-            await message.channel.send(f"Message heard from author {message.author}. You said:\n{message.content}")
+        # Ignore the bot's own messages, so that it never answers itself
+        if message.author == self.user:
+            return
+
+        # Commands lead with their keyword, e.g. "!user" in "!user @x role"
+        is_command = message.content.startswith(COMMAND_PREFIXES)
+        keyword = message.content.split(None, 1)[0] if is_command else ""
+
+        if is_command and self.command_writer is not None:
+            self.command_writer.record(db.CommandData(
+                id=message.id,
+                command=keyword,
+                user=message.author.id,
+                guild=message.guild.name if message.guild else "",
+                channel=getattr(message.channel, "name", None) or "",
+                created_at=message.created_at,
+                content=message.content
+            ))
+
+        # Hand the message to the Command registered for its keyword, if any
+        handler = commands.HANDLERS.get(keyword.lstrip("!/").lower())
+
+        if handler is None:
+            await message.channel.send(
+                ECHO_TEMPLATE % (message.author, message.content))
+            return
+
+        try:
+            reply = handler(message.content).execute()
+        except UnsupportedVerbException as e:
+            reply = str(e)
+
+        await message.channel.send(reply)
 
 if __name__ == '__main__':
+    # Swap in uvloop's faster event loop where it's available. It doesn't
+    # support Windows, so fall back to asyncio's default loop without it.
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     client = PFLTK_DiscordClient(intents=intents)
-    client.run(token=token)
-
-# # Initialize the client using the specified intents
-# client = discord.Client(intents=intents)
-
-# # Set an event to announce in log when ready
-# @client.event
-# async def on_ready():
-#     log.info(f'PFL-TK logged in as {client.user}')
-
-# # Set an event to handle incoming messages
-# @client.event
-# async def on_message(message: discord.Message):
-#     if message.author != own_name:
-#         response = \
-#             f'Greetings {message.author}. Your message reads: {message.content}'
-#         await message.channel.send(response)
-
-# # If this file was called directly as a script, host the bot.
-# if __name__ == "__main__":
-#     client.run(token=token)
+    # Have discord.py put its log handler on the root logger rather than
+    # its own, so that records from the "pfltk" logger are shown as well
+    client.run(token=token, root_logger=True)
@@ -1,8 +1,30 @@
-#from src.commands.command import Command, UnsupportedVerbException
+"""
+Contains classes and functions for receiving and responding to messages
+involving the bot on Discord. These serve as elements of the Discord-facing
+UI and are a starting point for feature logic as it's implemented by the bot.
+
+If it's a slash command (/thing) or bang command (!thing), it lives here! :)
+"""
+from typing import Dict, Type
+
 from src.commands.command import Command, CommandData, UnsupportedVerbException
+from src.commands.user import \
+    UserCommand, \
+    UserAlreadyHasRoleException, \
+    UserRoleDoesNotExistException
+
+# Maps each command's keyword (the "user" in "!user ...") to the Command
+# class which handles it, so that dispatch is a single dict lookup.
+HANDLERS: Dict[str, Type[Command]] = {
+    "user": UserCommand
+}
 
 __all__=[
+    "HANDLERS",
     "Command",
     "CommandData",
-    "UnsupportedVerbException"
-]
\ No newline at end of file
+    "UnsupportedVerbException",
+    "UserCommand",
+    "UserAlreadyHasRoleException",
+    "UserRoleDoesNotExistException"
+]
@@ -1,14 +1,17 @@
 """
-Contains classes and functions for receiving and responding to messages
-involving the bot on Discord. These serve as elements of the Discord-facing
-UI and are a starting point for feature logic as it's implemented by the bot.
-
-If it's a slash command (/thing) or bang command (!thing), it lives here! :)
+Contains the !user command, which discord users call to manage the
+roles and bans of other users on their server, and its exceptions.
 """
-from typing import List
+import re
+from typing import ClassVar, FrozenSet, Tuple
 
 from src.commands.command import Command, UnsupportedVerbException
 
+# Matches "[!user|/user] @username verb ...", capturing the target user and
+# the verb. The leading keyword is optional, and possessive so that it's
+# never mistaken for the username when the rest of the command is missing.
+_USER_COMMAND_RE = re.compile(r"^(?:[!/]user\s+)?+(\S+)\s+(\S+)", re.IGNORECASE)
+
 class UserAlreadyHasRoleException(Exception):
     """
     Represents an instance where an attempt was made to give a user
@@ -58,7 +61,9 @@ class UserCommand(Command):
                 Ex: "!user @bigJerk tempban 3 days 'ticket claim griefing'"
 
     """
-    
+    # The verbs to which a UserCommand can respond
+    _ALLOWED_VERBS: ClassVar[FrozenSet[str]] = \
+        frozenset({"role", "ban", "tempban"})
 
     @property
     def username(self) -> str:
@@ -70,49 +75,41 @@ class UserCommand(Command):
         return "user"
     
     @property
-    def allowed_verbs(self) -> List[str]:
-        """The list of verbs to which this command can respond"""
-        return [
-            "role",
-            "ban",
-            "tempban"
-        ]
+    def allowed_verbs(self) -> Tuple[str, ...]:
+        """The verbs to which this command can respond"""
+        return tuple(sorted(self._ALLOWED_VERBS))
     
     def execute(self) -> str:
         """
         Execute the command in question, returning a message to be
         sent back to the user who called the command if successful.
 
-        Raises:
-            UserAlreadyHasRoleException:
-            Raised if the user already has the specified role
+        None of the command's verbs are implemented yet, so for now this
+        only tells the user as much.
 
         Returns:
             str: A message to be returned to the user who submitted the command
         """
-        raise UserAlreadyHasRoleException()
-        pass
+        return "The !user command isn't supported yet."
     
     def __init__(self, input_text: str) -> None:
         # Call the base constructor which records the original input text
-        super().__init__(self, input_text)
+        super().__init__(input_text)
 
-        # Split the command by space into a list of tokens, as well
-        # as dropping the first one if it's "/user" or "!user"
-        all_tokens = input_text.split(" ")
-        tokens = \
-            all_tokens \
-            if all_tokens[0].lower() not in ["!user", "/user"] \
-            else all_tokens[1:]
-        
-        # Identify the target discord user and primary verb
-        username = tokens[0]
-        verb = tokens[1].lower()
+        # Identify the target discord user and primary verb, skipping
+        # the leading "/user" or "!user" if there is one
+        match = _USER_COMMAND_RE.match(input_text)
+        username, verb = \
+            (match.group(1), match.group(2).lower()) \
+            if match is not None \
+            else (None, "")
 
         # Throw an exception if that verb is not in the list of allowed verbs
-        if verb not in self.allowed_verbs:
+        if verb not in UserCommand._ALLOWED_VERBS:
             raise UnsupportedVerbException(
                 verb=verb,
                 command=self.command,
                 message=input_text
             )
+
+        self._username = username
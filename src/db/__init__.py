@@ -4,8 +4,10 @@ this application. By default this is a local SQLite file in its host
 filesystem, but this could hypothetically be replaced with a remote
 connection string in the config.py file.
 """
+import importlib
 
 from .db import DB
+from .pool import ConnectionPool
 from .exceptions import \
     MultipleUniqueRowsException, \
     UniqueRowNotFoundException, \
@@ -32,22 +34,35 @@ from . import icons
 from .icons import \
     Icon
 
-from . import tickets
-from .tickets import \
-    Ticket, \
-    CannotCreateTicketForWarException
-
-from . import commands
-from .commands import \
-    CommandData
-
-from . import users
-from users import \
-    User
+# The tickets, commands, and users modules only matter once the bot is
+# serving Discord, so they (and the names below) are imported on first
+# access rather than here. That keeps cold starts via manual_init.py
+# from loading them at all.
+_LAZY_MODULES = frozenset({"tickets", "commands", "users"})
+_LAZY_NAMES = {
+    "Ticket": "tickets",
+    "CannotCreateTicketForWarException": "tickets",
+    "CommandData": "commands",
+    "CommandWriter": "commands",
+    "User": "users"
+}
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f".{name}", __name__)
+
+    if name in _LAZY_NAMES:
+        module = importlib.import_module(f".{_LAZY_NAMES[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     # Core module and shared exceptions
     "db",
+    "ConnectionPool",
     "MultipleUniqueRowsException",
     "UniqueRowNotFoundException",
     "NoDataReturnedException",
@@ -76,11 +91,12 @@ __all__ = [
     # Tickets module
     "Ticket",
     "tickets",
-    "CannotCreateTicketForWarException"
+    "CannotCreateTicketForWarException",
 
     # Commands module
     "CommandData",
-    "commands"
+    "CommandWriter",
+    "commands",
 
     # Users module
     "User",
@@ -3,10 +3,34 @@ Contains classes and methods for interacting with the
 'commands' table of the database, which is responsible
 for tracking all incoming command-type messages.
 """
+import asyncio
 import datetime
+import logging
 import sqlite3
-from typing import NamedTuple
-from exceptions import UniqueRowNotFoundException
+from typing import Iterable, List, NamedTuple
+from .db import DB
+from .exceptions import UniqueRowNotFoundException
+
+log = logging.getLogger(__name__)
+
+# Hot-path statements are kept as module constants so every call passes
+# the connection the identical SQL text, and so hits the same long-lived
+# prepared statement in its cache (shared by single and batched inserts).
+_SQL_INSERT_COMMAND = 'INSERT INTO commands VALUES (?, ?, ?, ?, ?, ?, ?)'
+
+# Looks up a single command by its message ID
+_SQL_SELECT_COMMAND = """
+    SELECT 
+        message_id,
+        command,
+        user,
+        guild,
+        channel,
+        created_at,
+        content
+    FROM commands
+    WHERE message_id = ?
+"""
 
 class CommandData(NamedTuple):
     """
@@ -24,7 +48,14 @@ class CommandData(NamedTuple):
     created_at: datetime.datetime
     content: str
 
-def insert_command(data: CommandData, conn: sqlite3.connection) -> None:
+def _command_from_row(cursor: sqlite3.Cursor, row: tuple) -> CommandData:
+    """
+    Row factory which has a cursor return rows of the commands table as
+    CommandData. Its created_at value already comes back as a datetime.
+    """
+    return CommandData._make(row)
+
+def insert_command(data: CommandData, conn: sqlite3.Connection) -> None:
     """
     Inserts a new row into the commands table representing the data shared
     by all incoming commands (such as origin and message content).
@@ -35,16 +66,191 @@ def insert_command(data: CommandData, conn: sqlite3.connection) -> None:
 
     Args:
         data (CommandData): A CommandData object containing the information 
-        for an incoming command message.
-        conn (sqlite3.connection): An active SQLite3 connection object to
+        for an incoming command message. Fields are read by name, so either
+        this module's NamedTuple or src.commands' CommandData will do.
+        conn (sqlite3.Connection): An active SQLite3 connection object to
         the application's active database instance.
     """    
-    # Define query
-    query = 'INSERT INTO commands VALUES (?, ?, ?, ?, ?, ?, ?)'
+    # Define query and parameters
+    query = _SQL_INSERT_COMMAND
+    params = (
+        data.id,
+        data.command,
+        data.user,
+        data.guild,
+        data.channel,
+        data.created_at,
+        data.content
+    )
+
+    # Execute parameterized query, reusing the connection's prepared statement
+    conn.execute(query, params)
+
+def insert_commands(
+        data: Iterable[CommandData],
+        conn: sqlite3.Connection) -> None:
+    """
+    Inserts many rows into the commands table with a single executemany,
+    so that a burst of incoming messages shares one statement and (if the
+    caller commits once afterwards) one transaction.
+
+    Args:
+        data (Iterable[CommandData]): The command messages to insert.
+        Fields are read by name, as with insert_command.
+        conn (sqlite3.Connection): An active SQLite3 connection object to
+        the application's active database instance.
+    """
+    # Define query and one tuple of parameters per command
+    query = _SQL_INSERT_COMMAND
+    params = (
+        (
+            row.id,
+            row.command,
+            row.user,
+            row.guild,
+            row.channel,
+            row.created_at,
+            row.content
+        )
+        for row in data
+    )
+
+    # Execute the query once per row
+    conn.executemany(query, params)
+
+class CommandWriter:
+    """
+    Buffers incoming command messages on an asyncio queue and writes them
+    to the commands table in batches from a background task, so that a
+    burst of messages costs one transaction (and one fsync) rather than
+    one apiece.
 
-    # Get cursor and execute parameterized query
-    cursor = conn.cursor()
-    cursor.execute(query, data)
+    A batch is written once it reaches max_batch rows or once its first
+    row has waited flush_interval seconds, whichever comes first. Writes
+    go through the DB's pooled writer connection on a worker thread, so
+    the event loop never blocks on SQLite.
+
+    The queue holds at most max_queue commands, so that if writes ever
+    fall behind, memory use stays bounded; commands recorded while it's
+    full are logged and dropped.
+    """
+    def __init__(
+            self,
+            db: DB,
+            max_batch: int = 64,
+            flush_interval: float = 0.1,
+            max_queue: int = 4096) -> None:
+        """
+        Args:
+            db (DB): The database to write commands into
+            max_batch (int, optional): The most rows to write in one
+            transaction. Defaults to 64.
+            flush_interval (float, optional): The longest a row may wait,
+            in seconds, before its batch is written. Defaults to 0.1.
+            max_queue (int, optional): The most commands to hold while
+            they wait to be written. Defaults to 4096.
+        """
+        self.db = db
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """
+        Launches the background task which drains the queue. Must be
+        called from within a running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def record(self, data: CommandData) -> None:
+        """
+        Queues a command to be written with the next batch, or logs and
+        drops it if the queue is already full.
+
+        Args:
+            data (CommandData): The incoming command message to store
+        """
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            log.warning(
+                "Command queue is full; dropped command %s", data.id)
+
+    async def close(self) -> None:
+        """
+        Writes whatever is still queued and stops the background task.
+        Commands recorded after this is called won't be written.
+        """
+        if self._task is None:
+            return
+
+        # A None on the queue tells the background task to finish up. It
+        # waits for room, rather than being dropped, if the queue is full.
+        await self.queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        """Collects queued commands into batches and writes them."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            # Wait as long as it takes for the first row of a batch
+            row = await self.queue.get()
+            if row is None:
+                break
+            batch: List[CommandData] = [row]
+
+            # Then give the batch until the deadline to fill up
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    row = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[CommandData]) -> None:
+        """
+        Writes a batch of commands in one transaction on a worker thread.
+
+        If the batch fails on a constraint, such as a repeated message ID,
+        its rows are written again one at a time so that only the bad ones
+        are lost. Any other failure is logged and the batch dropped. Errors
+        are never raised, so the background task keeps running.
+        """
+        try:
+            await self.db.run_write(insert_commands, batch)
+        except sqlite3.IntegrityError:
+            await self._flush_each(batch)
+        except Exception:
+            log.exception(
+                "Failed to record a batch of %s commands", len(batch))
+
+    async def _flush_each(self, batch: List[CommandData]) -> None:
+        """
+        Writes each command in a batch in its own transaction, logging and
+        dropping any which fail.
+        """
+        for row in batch:
+            try:
+                await self.db.run_write(insert_command, row)
+            except Exception:
+                log.exception(
+                    "Failed to record command %s", getattr(row, "id", row))
 
 def select_command(id: int, conn: sqlite3.Connection) -> CommandData:
     """
@@ -63,29 +269,20 @@ def select_command(id: int, conn: sqlite3.Connection) -> CommandData:
         CommandData: The data of the matching row in the 'commands' table.
     """    
     # Define query and sole parameter
-    query = """
-        SELECT 
-            message_id,
-            command,
-            user,
-            guild,
-            created_at,
-            content
-        FROM commands
-        WHERE message_id = ?
-    """
+    query = _SQL_SELECT_COMMAND
     params = (id,)
 
-    # Get cursor, execute query, and fetch results list
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+    # Execute query, have the cursor build CommandData rows, and fetch the
+    # sole row (message_id is the primary key, so there's at most one)
+    cursor = conn.execute(query, params)
+    cursor.row_factory = _command_from_row
+    result = cursor.fetchone()
 
     # Raise a specific exception if no result was returned
-    if len(results) == 0:
+    if result is None:
         message = f"No command found in DB with message_id = {str(id)}"
         raise UniqueRowNotFoundException(message)
     
     # Otherwise, return the sole result
     else:
-        return CommandData(*results[0])
+        return result
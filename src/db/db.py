@@ -2,17 +2,96 @@ import sqlite3
 import typing
 import datetime
 import asyncio
+from contextlib import contextmanager
+
+from .pool import ConnectionPool
+
+# Tuning stored in the database file itself, so it only needs applying once
+# when the database is generated. 8 KiB pages fit more rows per page read,
+# but only take effect on a new database, and so must come before WAL (after
+# which the page size is fixed). WAL lets readers carry on while a write is
+# in progress, and is what makes synchronous=NORMAL below safe to use.
+DATABASE_PRAGMAS = """
+    PRAGMA page_size = 8192;
+    PRAGMA journal_mode = WAL;
+"""
+
+# Tuning applied to every connection as soon as it's opened, since SQLite
+# forgets these when a connection closes. synchronous=NORMAL spares us an
+# fsync on every commit under WAL. The rest keep the page cache (up to 64
+# MiB, only allocated as it fills), temporary tables, and (via mmap) most
+# reads in memory, and make a connection wait on a busy database for a few
+# seconds rather than failing straight away. wal_autocheckpoint is spelled
+# out so the WAL file stays bounded at around 1000 pages even through the
+# large write bursts of a war sync.
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous = NORMAL;
+    PRAGMA busy_timeout = 5000;
+    PRAGMA cache_size = -65536;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA wal_autocheckpoint = 1000;
+"""
+
+# Opens the transaction the schema is created in. executescript() commits
+# any open transaction before it runs, so this has to lead the script itself.
+_SCHEMA_TRANSACTION_START = "BEGIN IMMEDIATE;"
+
+# Lists the columns of the 'wars' table, one row per column with its name
+# second, to tell whether a database predates the table's etag column
+_SQL_WARS_TABLE_INFO = "PRAGMA table_info(wars)"
+
+# Adds the etag column to a 'wars' table created before it existed. Rows
+# already on record are left without an ETag, as if none had been sent.
+_SQL_ADD_WARS_ETAG = "ALTER TABLE wars ADD COLUMN etag TEXT"
+
+# How many prepared statements each connection keeps for reuse, keyed by
+# their SQL text. The default of 128 is easily enough today, but leaves
+# little headroom before hot inserts would start being re-prepared.
+STATEMENT_CACHE_SIZE = 256
+
+# Dates are stored in TIMESTAMP columns as whole microseconds since this
+# (naive) epoch. Working in timedeltas rather than float timestamps keeps
+# round trips exact. The conversion to and from datetimes is registered
+# with the sqlite3 module below, so queries needn't do it by hand.
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+class OptimizingConnection(sqlite3.Connection):
+    """
+    A SQLite3 connection which runs PRAGMA optimize as it closes, as SQLite
+    recommends, so that the query planner's statistics keep up with tables
+    as they grow without the application having to ANALYZE by hand.
+    """
+    def close(self) -> None:
+        try:
+            self.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            # Read-only and already-closed connections can't be optimized
+            pass
+
+        super().close()
+
 
 class DB:
+    # One shared pool per connection string, however many DB objects are made
+    _pools: typing.Dict[str, ConnectionPool] = {}
+
     _creation_sql = """
         /*
         Represents a single war on the server for which this application
         has been set up. Used primarily to distinguish maps and the
         things associated with them as unique across wars.
+
+        The ETag of the /war response the war was synced from is kept
+        alongside it, so that the next sync can ask the API whether
+        anything has changed since. Not every response carries one.
         */
         CREATE TABLE IF NOT EXISTS wars (
             war_number INTEGER PRIMARY KEY NOT NULL,
-            last_fetched_on TEXT NOT NULL
+            last_fetched_on TIMESTAMP NOT NULL,
+            etag TEXT
         );
 
         /*
@@ -36,6 +115,16 @@ class DB:
             ON DELETE CASCADE
         );
 
+        /*
+        Maps are mostly looked up by war alone (to find the newest war's
+        hexes), which the primary key can't serve since it leads with the
+        map name. This index covers those lookups outright. Labels and icons
+        need no such index, as their primary keys already lead with the
+        hex and war they're always filtered on.
+        */
+        CREATE INDEX IF NOT EXISTS idx_maps_war_map
+        ON maps (war_number, map_name);
+
         /*
         Represents a map label, of the kind used to distinguish the
         individual sub-zones within each hex. Since map location data
@@ -48,6 +137,11 @@ class DB:
 
         Since these are associated uniquely with the maps table, they're
         unique to a given hex in a given war at a unique x and y position.
+
+        Like icons, rows are stored WITHOUT ROWID. Labels are only ever
+        looked up by hex and war, a prefix of the primary key, so clustering
+        rows on that key lets the lookup read x and y straight off the key's
+        own b-tree instead of following each match back to a rowid table.
         */
         CREATE TABLE IF NOT EXISTS labels (
             map_name TEXT NOT NULL,
@@ -75,7 +169,7 @@ class DB:
             )
             ON UPDATE CASCADE
             ON DELETE CASCADE
-        );
+        ) WITHOUT ROWID;
 
         /*
         Essentially a codebook table for the 'icon_type' variable
@@ -103,6 +197,10 @@ class DB:
         or "the Storage Depot near The Abandoned Ward" when describing origin
         points and destinations for logistics tickets. Not ideal, but it's
         close enough to get people on task.
+
+        Rows are stored WITHOUT ROWID, clustered on the primary key itself,
+        since every lookup goes through that key anyway. This avoids keeping
+        a second copy of each row's key columns in a separate PK index.
         */
         CREATE TABLE IF NOT EXISTS icons (
             map_name TEXT NOT NULL,
@@ -132,11 +230,34 @@ class DB:
             )
             ON UPDATE CASCADE
             ON DELETE CASCADE
-        );
+        ) WITHOUT ROWID;
+
+        /*
+        Represents the role held by a single discord user on a single server,
+        which determines what that user may ask of the ticker there.
+
+        A user's role is always looked up by their ID and server together,
+        so rows are clustered WITHOUT ROWID on exactly that key, and each
+        lookup finds the role in the same b-tree page as the key itself.
+        */
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER NOT NULL,
+            guild TEXT NOT NULL,
+            role TEXT NOT NULL,
+
+            CONSTRAINT pk_users
+            PRIMARY KEY (
+                user_id,
+                guild
+            )
+        ) WITHOUT ROWID;
 
         /*
         Represents a single hauling or touch task managed by the ticker.
 
+        Its ticket_number is an INTEGER PRIMARY KEY, and so an alias for the
+        rowid, meaning that selecting a ticket by number needs no index.
+
         Associated with a specific destination and an optional origin.
         A procurement order, for instance, has a destination but no origin.
         A delivery order would have both a destination and an origin, and a
@@ -157,7 +278,7 @@ class DB:
             origin_description TEXT,
 
             objective_description TEXT NOT NULL,
-            created_on TEXT NOT NULL,
+            created_on TIMESTAMP NOT NULL,
 
             CONSTRAINT fk_ticket_destination_label
             FOREIGN KEY (
@@ -198,78 +319,280 @@ class DB:
             user INTEGER NOT NULL,
             guild TEXT NOT NULL,
             channel TEXT NOT NULL,
-            created_at TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL,
             content TEXT NOT NULL
         )
     """
 
     @staticmethod
-    def format_date_for_db(dt: datetime.datetime) -> str:
+    def format_date_for_db(dt: datetime.datetime) -> int:
         """
-        Converts a datetime into an ISO8601 string (eg "YYYY-MM-DD HH:MM:SS.etc").
+        Converts a datetime into an integer count of microseconds since the
+        Unix epoch, which SQLite stores more compactly than a date string.
         Included in the DB module because SQLite doesn't have a native date format.
 
+        Naive datetimes are stored as-is, while timezone-aware ones
+        are converted to UTC first (and so come back naive, in UTC).
+
         Args:
             dt (datetime.datetime): The datetime to be converted
 
         Returns:
-            str: The ISO8601 formatting of the provided string
+            int: Microseconds between the epoch and the provided datetime
         """
-        
-        return dt.isoformat()
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+        return (dt - _EPOCH) // _MICROSECOND
     
     @staticmethod
-    def format_date_from_db(dt: str) -> datetime.datetime:
+    def format_date_from_db(dt: int | str) -> datetime.datetime:
         """
-        Converts an ISO8601 string (eg "YYYY-MM-DD HH:MM:SS.etc") into a Python
-        datetime object, working around SQLite's lack of datetime values.
+        Converts an integer count of microseconds since the Unix epoch into a
+        Python datetime object, working around SQLite's lack of datetime values.
+
+        ISO8601 strings (eg "YYYY-MM-DD HH:MM:SS.etc"), as stored by older
+        versions of the application, are also accepted.
 
         Args:
-            dt (str): A datetime represented as an ISO8601 formatted string
+            dt (int | str): A datetime as stored in the database
 
         Returns:
-            datetime.datetime: A datetime object corresponding to the provided string
+            datetime.datetime: A datetime object corresponding to the provided value
+        """
+        if isinstance(dt, str):
+            return datetime.datetime.fromisoformat(dt)
+
+        return _EPOCH + datetime.timedelta(microseconds=dt)
+
+    @staticmethod
+    def apply_pragmas(
+            conn: sqlite3.Connection,
+            pragmas: str = CONNECTION_PRAGMAS) -> None:
+        """
+        Applies per-connection tuning, by default the application's standard
+        CONNECTION_PRAGMAS, to a connection. Should be called before any
+        transaction is opened on it.
+
+        Args:
+            conn (sqlite3.Connection): A live SQLite3 connection to tune
+            pragmas (str, optional): The script of PRAGMA statements to run.
+            Defaults to CONNECTION_PRAGMAS.
         """
-        return datetime.datetime.fromisoformat(dt)
+        conn.executescript(pragmas)
 
     def get_connection(self) -> sqlite3.Connection:
         """
         Generates a new SQLite3 connection object based on
         the connection string provided at instantiation.
 
+        Implicit transactions on the returned connection are opened with
+        BEGIN IMMEDIATE, so a write transaction takes the database's write
+        lock up front instead of failing partway through with SQLITE_BUSY.
+        Each connection also keeps up to STATEMENT_CACHE_SIZE prepared
+        statements, so repeated queries skip SQLite's parse-and-plan step,
+        and runs PRAGMA optimize when it's closed.
+
+        TIMESTAMP columns are read back as datetimes by the sqlite3 module
+        itself, and datetimes may be passed straight in as parameters.
+
+        The connection string may be a plain file path or a "file:" URI,
+        such as "file::memory:?cache=shared" for a shared in-memory database.
+
         Returns:
             sqlite3.Connection: A SQLite3 connection object, based on the given string
         """
-        return sqlite3.connect(self.connection_string)
+        conn = sqlite3.connect(
+            self.connection_string,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            isolation_level="IMMEDIATE",
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=OptimizingConnection,
+            uri=True
+        )
+        self.apply_pragmas(conn, self.pragmas)
+
+        return conn
     
+    def get_pool(self) -> ConnectionPool:
+        """
+        Returns the connection pool shared by every DB object with this
+        connection string, creating it on first use.
+
+        Returns:
+            ConnectionPool: The pool of connections to this database
+        """
+        pool = self._pools.get(self.connection_string)
+        if pool is None:
+            pool = ConnectionPool(self.get_connection)
+            self._pools[self.connection_string] = pool
+
+        return pool
+
+    @contextmanager
+    def reader(self) -> typing.Iterator[sqlite3.Connection]:
+        """
+        Borrows a pooled read-only connection for the duration of a with block.
+
+        Yields:
+            sqlite3.Connection: A live connection which may only be read from
+        """
+        with self.get_pool().reader() as conn:
+            yield conn
+
+    @contextmanager
+    def writer(self) -> typing.Iterator[sqlite3.Connection]:
+        """
+        Borrows the pooled writer connection for the duration of a with block,
+        committing on a clean exit and rolling back if the block raises.
+
+        Yields:
+            sqlite3.Connection: The database's sole pooled writable connection
+        """
+        with self.get_pool().writer() as conn:
+            yield conn
+
+    async def run_read(
+            self,
+            func: typing.Callable[..., typing.Any],
+            *args: typing.Any) -> typing.Any:
+        """
+        Calls one of the DB modules' query functions on a pooled read-only
+        connection in a worker thread, so the event loop isn't blocked while
+        SQLite works. The connection is passed as the function's last
+        argument, after any given here, as the query functions expect.
+
+        Example:
+            war = await data.run_read(db.wars.select_latest_war)
+
+        Args:
+            func (Callable[..., Any]): The query function to call
+            *args (Any): Arguments to pass before the connection
+
+        Returns:
+            Any: Whatever the query function returns
+        """
+        def call() -> typing.Any:
+            with self.reader() as conn:
+                return func(*args, conn)
+
+        return await asyncio.to_thread(call)
+
+    async def run_write(
+            self,
+            func: typing.Callable[..., typing.Any],
+            *args: typing.Any) -> typing.Any:
+        """
+        Calls one of the DB modules' functions on the pooled writer connection
+        in a worker thread, committing afterwards (or rolling back if it
+        raises). Otherwise works as run_read() does.
+
+        Args:
+            func (Callable[..., Any]): The function to call
+            *args (Any): Arguments to pass before the connection
+
+        Returns:
+            Any: Whatever the function returns
+        """
+        def call() -> typing.Any:
+            with self.writer() as conn:
+                return func(*args, conn)
+
+        return await asyncio.to_thread(call)
+
+    @staticmethod
+    def upgrade_schema(conn: sqlite3.Connection) -> None:
+        """
+        Brings tables created by an earlier version of the schema up to
+        date, since CREATE TABLE IF NOT EXISTS leaves existing tables as
+        they are. Runs in whatever transaction the connection has open.
+
+        Args:
+            conn (sqlite3.Connection): A live, writable SQLite3 connection
+            to a database whose tables have already been created
+        """
+        wars_columns = {row[1] for row in conn.execute(_SQL_WARS_TABLE_INFO)}
+        if "etag" not in wars_columns:
+            conn.execute(_SQL_ADD_WARS_ETAG)
+
     @classmethod
-    def generate_db_from_conn(cls, conn: sqlite3.Connection) -> None:
+    def generate_db_from_conn(
+            cls,
+            conn: sqlite3.Connection,
+            commit: bool = True) -> None:
         """
         Used to generate the DB when there's already a live connection.
         Does not close its provided connection.
 
+        The whole schema is created in a single transaction, rather than
+        each CREATE statement committing (and syncing) on its own. The
+        connection's own tuning is left as whoever opened it set it, as
+        DB.get_connection() does with its DB's pragmas.
+
         Args:
             conn (sqlite3.Connection): A live SQLite connection upon which
             to build the database as per the schema
+            commit (bool, optional): Whether to commit the schema straight
+            away. If False, the schema's transaction is left open for the
+            caller to add to and commit alongside its own changes.
+            Defaults to True.
         """
+        conn.executescript(DATABASE_PRAGMAS)
         cursor = conn.cursor()
 
-        cursor.executescript(cls._creation_sql)
-        conn.commit()
+        cursor.executescript(_SCHEMA_TRANSACTION_START + cls._creation_sql)
+        cls.upgrade_schema(conn)
+        if commit:
+            conn.commit()
 
     def generate_db(self) -> None:
         """
         Used to create the database file, if necessary, at instantiation.
+        Also switches the file over to WAL journaling, which sticks.
 
         The schema lives here.
         """
         
         conn = self.get_connection()
+        conn.executescript(DATABASE_PRAGMAS)
         cursor = conn.cursor()
 
-        cursor.executescript(self._creation_sql)
+        cursor.executescript(_SCHEMA_TRANSACTION_START + self._creation_sql)
+        self.upgrade_schema(conn)
         conn.commit()
         conn.close()
     
-    def __init__(self, connection_string: str):
+    def __init__(
+            self,
+            connection_string: str,
+            pragmas: str = CONNECTION_PRAGMAS):
+        """
+        Args:
+            connection_string (str): A file path or "file:" URI to connect to
+            pragmas (str, optional): The PRAGMA script each new connection is
+            tuned with. Only worth overriding for throwaway databases, such
+            as the test suite's. Defaults to CONNECTION_PRAGMAS.
+        """
         self.connection_string = connection_string
+        self.pragmas = pragmas
+
+
+def _convert_timestamp(value: bytes) -> datetime.datetime:
+    """
+    Converter for TIMESTAMP columns, which sqlite3 hands their raw value as
+    bytes: either a microsecond count or a legacy ISO8601 string.
+
+    Runs once per date in every row read, so the common case does the
+    arithmetic inline rather than going through format_date_from_db().
+    """
+    try:
+        return _EPOCH + datetime.timedelta(microseconds=int(value))
+    except ValueError:
+        return datetime.datetime.fromisoformat(value.decode())
+
+
+# Let the sqlite3 module convert datetimes on its way in and out of the
+# database, rather than every query doing so itself.
+sqlite3.register_adapter(datetime.datetime, DB.format_date_for_db)
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
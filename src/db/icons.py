@@ -5,7 +5,51 @@ import sqlite3
 
 from .. import db
 from . import exceptions
-from typing import List, Tuple, NamedTuple
+from typing import Iterable, Iterator, List, Tuple, NamedTuple
+
+# Shared by insert_icon and insert_icons, so both reuse one cached prepared statement
+_SQL_INSERT_ICON = "INSERT INTO icons VALUES (?, ?, ?, ?, ?, ?)"
+
+# How many icon rows to pull from SQLite per fetchmany call when streaming
+ICON_FETCH_SIZE = 1000
+
+# Finds the latest war, checks that the map exists in it, and joins on that
+# map's icons. It always returns at least one row, whose first two columns
+# carry the war number and map check; the icon columns are NULL if there
+# are no icons to return.
+_SQL_SELECT_LATEST_ICONS = """
+    WITH latest AS (
+        SELECT
+            MAX(war_number) AS war_number
+        FROM wars
+    ),
+    target AS (
+        SELECT
+            latest.war_number AS war_number,
+            EXISTS (
+                SELECT 1
+                FROM maps
+                WHERE
+                    maps.map_name = :map_name
+                    AND maps.war_number = latest.war_number
+            ) AS map_exists
+        FROM latest
+    )
+    SELECT
+        target.war_number,
+        target.map_exists,
+        icons.map_name,
+        icons.war_number,
+        icons.x,
+        icons.y,
+        icons.icon_type,
+        icons.flags
+    FROM target
+    LEFT JOIN icons
+        ON target.map_exists
+        AND icons.map_name = :map_name
+        AND icons.war_number = target.war_number
+"""
 
 
 class Icon(NamedTuple):
@@ -47,72 +91,128 @@ def insert_icon(
         perform this insert query.
     """    
     # Define query
-    query = """
-        INSERT INTO icons
-        VALUES (?, ?, ?, ?, ?, ?)
-    """
+    query = _SQL_INSERT_ICON
     
-    # Get cursor and define parameter tuple
-    cursor = conn.cursor()
+    # Define parameter tuple
     params = (map_name, war_number, x, y, icon_type, flags)
 
-    # Execute query
-    cursor.execute(query, params)
+    # Execute query on the connection, reusing its cached prepared statement
+    conn.execute(query, params)
 
-def get_latest_icons_for_map(
+def insert_icons(
+        icons: Iterable[Tuple[str, int, float, float, int, int]],
+        conn: sqlite3.Connection
+    ) -> None:
+    """
+    Inserts many rows into the 'icons' table with a single executemany.
+    Doesn't commit, so that a whole batch of icons can be written in the
+    caller's transaction and cost one fsync rather than one per row.
+
+    Args:
+        icons (Iterable[Tuple[str, int, float, float, int, int]]): Icon
+        NamedTuples, or any tuples in the order (map name, war number,
+        x, y, icon type, flags)
+        conn (sqlite3.Connection): A live database connection upon which to
+        perform these insert queries.
+    """
+    # Define query
+    query = _SQL_INSERT_ICON
+
+    # Execute the query once per icon
+    conn.executemany(query, icons)
+
+def iter_latest_icons_for_map(
         map_name: str,
         conn: sqlite3.Connection
-) -> List[Icon]:
+) -> Iterator[Icon]:
     """
-    Selects a list of icons for a specific map hex in a specific war.
-    Returns them in the format:
-    
-    (map name, war number, x, y, icon type, flags bitmask)
+    Yields the icons for a specific map hex in the latest war, pulling them
+    from the database ICON_FETCH_SIZE rows at a time rather than all at once,
+    so that callers can work through a large map without holding every row
+    in memory.
+
+    Since this is a generator, nothing is queried (and nothing is raised)
+    until the first icon is requested.
 
     Args:
         map_name (str): The systematic name of the hex for which to pull icons
-        war_number (int): The unique number of the war associated with that map
         conn (sqlite3.Connection): A live connection object on which to query
- 
-    Returns:
-        List[Tuple[str, int, float, float, int, int]]: A list of tuples
-        in the format (map name, war number, x, y, icon type, flags bitmask)
+
+    Raises:
+        NoDataReturnedException: Raised if there's no war on record, or no
+        rows at all in the 'maps' table
+        MapDoesNotExistInCurrentWarException: Raised if the map doesn't
+        exist in the latest war
+
+    Yields:
+        Icon: Named tuples in the format
+        (map name, war number, x, y, icon type, flags bitmask)
     """
-    # Get number of latest active war
-    latest_war, latest_war_fetched_on = \
-        db.wars.select_latest_war(conn)
-    
+    # Define the single query for the latest war, map check, and icons
+    query = _SQL_SELECT_LATEST_ICONS
+    params = {"map_name": map_name}
+
+    # Execute query and read the latest war and map check off the first row
+    cursor = conn.execute(query, params)
+    cursor.arraysize = ICON_FETCH_SIZE
+    first_row = cursor.fetchone()
+    latest_war, map_exists = first_row[0], first_row[1]
+
+    # Raise a specific exception if there's no war on record at all
+    if latest_war is None:
+        raise exceptions.NoDataReturnedException(
+            "No wars found. Was PFL-TK initialized correctly?")
+
     # Make sure that the map we asked for exists in the current war.
-    latest_maps = db.maps.select_latest_maps(conn)
-    if map_name not in [map_.map_name for map_ in latest_maps]:
+    if not map_exists:
         # Raise a specific exception if it doesn't.
         #
         # Note here that if this fails because there exist no rows
-        # in the 'maps' table for the current war, the previous step
+        # in the 'maps' table for the current war, the next step
         # will instead fail with an a NoMapsForCurrentWar exception.
         # 
         # This can be useful for discerning between "I asked for a
         # map that existed before but doesn't right now" and "my maps
         # table simply never initialized correctly for this war."
+        db.maps.select_latest_maps(conn)
         raise exceptions.MapDoesNotExistInCurrentWarException(
             map_name,
             latest_war
         )
 
-    # Define query
-    query = """
-        SELECT *
-        FROM icons
-        WHERE map_name = ?
-        AND war_number = ?
-    """
+    # The map exists but has no icons if the joined columns came back NULL
+    if first_row[2] is None:
+        return
 
-    # Generate cursor and build params tuple
-    cursor = conn.cursor()
-    params = (map_name, latest_war)
+    # Otherwise yield the first row, then the rest a chunk at a time
+    yield Icon._make(first_row[2:])
+    while rows := cursor.fetchmany():
+        for row in rows:
+            yield Icon._make(row[2:])
 
-    # Execute query, capture result as a list of named tuples, and return
-    result = cursor.execute(query, params)
-    icons = [Icon(*row) for row in result.fetchall()]
+def get_latest_icons_for_map(
+        map_name: str,
+        conn: sqlite3.Connection
+) -> List[Icon]:
+    """
+    Selects a list of icons for a specific map hex in a specific war.
+    Returns them in the format:
+    
+    (map name, war number, x, y, icon type, flags bitmask)
 
-    return icons
+    Args:
+        map_name (str): The systematic name of the hex for which to pull icons
+        war_number (int): The unique number of the war associated with that map
+        conn (sqlite3.Connection): A live connection object on which to query
+
+    Raises:
+        NoDataReturnedException: Raised if there's no war on record, or no
+        rows at all in the 'maps' table
+        MapDoesNotExistInCurrentWarException: Raised if the map doesn't
+        exist in the latest war
+ 
+    Returns:
+        List[Tuple[str, int, float, float, int, int]]: A list of tuples
+        in the format (map name, war number, x, y, icon type, flags bitmask)
+    """
+    return list(iter_latest_icons_for_map(map_name, conn))
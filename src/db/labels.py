@@ -3,9 +3,27 @@ Contains methods and classes for interacting with the 'labels' table.
 """
 
 import sqlite3
+import numpy as np
 
 from .. import db
-from typing import List, Tuple, NamedTuple
+from typing import Iterable, List, Tuple, NamedTuple
+
+# Shared by insert_label and insert_labels, so both reuse one cached prepared statement
+_SQL_INSERT_LABEL = "INSERT INTO labels VALUES (?, ?, ?, ?, ?)"
+
+# Selects every label on a given map in a given war
+_SQL_SELECT_LABELS_FOR_MAP = """
+    SELECT
+        map_name,
+        war_number,
+        label,
+        x,
+        y
+    FROM labels
+    WHERE 
+        map_name = ?
+        AND war_number = ?
+"""
 
 
 class Label(NamedTuple):
@@ -24,9 +42,22 @@ class NoLabelsForMapInCurrentWarException(Exception):
     """
     Represents an instance in which a query has been made to select labels
     for a specific map in a specific war, but no labels exist for it.
+
+    Its message is only built if it's actually shown.
     """
-    def __init__(self, *args: object) -> None:
-        super().__init__(*args)
+    def __init__(self, map_name: str, war_number: int) -> None:
+        super().__init__(map_name, war_number)
+        self.map_name = map_name
+        self.war_number = war_number
+
+    def __str__(self) -> str:
+        return \
+            f"No labels found for map {self.map_name} in latest war " \
+            f"(#{self.war_number}). Did PFL-TK initialize correctly?"
+
+def _label_from_row(cursor: sqlite3.Cursor, row: tuple) -> Label:
+    """Row factory which has a cursor return its rows as Labels."""
+    return Label._make(row)
 
 def insert_label(
         map_name: str, 
@@ -51,14 +82,35 @@ def insert_label(
         y (float): The relative [0.0, 1.0] Y position of the label
         conn (sqlite3.Connection): A live DB connection to which to write
     """
-    # Define the query, cursor, and parameters
-    sql = "INSERT INTO labels VALUES (?, ?, ?, ?, ?)"
+    # Define the query and parameters
+    sql = _SQL_INSERT_LABEL
     params = (map_name, war_number, label, x, y)
 
-    cursor = conn.cursor()
+    # Execute the query on the specified database,
+    # reusing the connection's cached prepared statement
+    conn.execute(sql, params)
+
+
+def insert_labels(
+        labels: Iterable[Tuple[str, int, str, float, float]],
+        conn: sqlite3.Connection
+    ):
+    """
+    Inserts many rows into the 'labels' table with a single executemany.
+    Doesn't commit, so that a whole batch of labels can be written in the
+    caller's transaction and cost one fsync rather than one per row.
+
+    Args:
+        labels (Iterable[Tuple[str, int, str, float, float]]): Label
+        NamedTuples, or any tuples in the order (map name, war number,
+        label, x, y)
+        conn (sqlite3.Connection): A live DB connection to which to write
+    """
+    # Define the query
+    sql = _SQL_INSERT_LABEL
 
-    # Execute the query on the specified database
-    cursor.execute(sql, params)
+    # Execute the query once per label on the specified database
+    conn.executemany(sql, labels)
 
 
 def select_latest_labels_for_map(
@@ -81,34 +133,54 @@ def select_latest_labels_for_map(
         Label: a list of named tuples of (map_name, war_number, label, x, y)
     """    
     # Get the number of the latest war in the DB
-    latest_war, latest_pulled_on = db.wars.select_latest_war(conn)
-
-    # Define query, cursor, and parameters
-    sql = """
-        SELECT
-            map_name,
-            war_number,
-            label,
-            x,
-            y
-        FROM labels
-        WHERE 
-            map_name = ?
-            AND war_number = ?
-    """
+    latest_war = db.wars.latest_war(conn).war_number
+
+    # Define query and parameters
+    sql = _SQL_SELECT_LABELS_FOR_MAP
     params = (map_name, latest_war)
-    cursor = conn.cursor()
 
-    # Execute the query and get the list of row tuple results
-    results = cursor.execute(sql, params).fetchall()
+    # Execute the query, having the cursor build each row as a named tuple
+    cursor = conn.execute(sql, params)
+    cursor.row_factory = _label_from_row
 
-    # Check whether we got any results
-    if len(results) == 0:
+    # Check whether we got any results by pulling just the first row
+    first = next(cursor, None)
+    if first is None:
         # If not, raise an exception
-        message = \
-            f"No labels found for map {map_name} in latest war (#{latest_war})." \
-            "Did PFL-TK initialize correctly?"
-        raise NoLabelsForMapInCurrentWarException(message)
+        raise NoLabelsForMapInCurrentWarException(map_name, latest_war)
     else:
-        # Otherwise, return the rows as named tuples
-        return [Label(*row) for row in results]
\ No newline at end of file
+        # Otherwise, return it and the rest of the rows as named tuples
+        return [first, *cursor]
+
+
+def assign_nearest_labels(
+        icons_xy: np.ndarray,
+        labels_xy: np.ndarray
+    ) -> np.ndarray:
+    """
+    Finds the closest label to each of a set of map icons by Euclidean
+    distance, as described by the schema, computing every icon-to-label
+    distance at once with NumPy broadcasting rather than a Python loop.
+
+    Args:
+        icons_xy (np.ndarray): An (N, 2) array-like of icon x and y positions
+        labels_xy (np.ndarray): An (M, 2) array-like of label x and y
+        positions, from the same hex as the icons
+
+    Raises:
+        ValueError: Raised if no label positions are given
+
+    Returns:
+        np.ndarray: An array of N indexes into labels_xy, giving the
+        nearest label to each icon in turn
+    """
+    icons_xy = np.asarray(icons_xy, dtype=np.float64).reshape(-1, 2)
+    labels_xy = np.asarray(labels_xy, dtype=np.float64).reshape(-1, 2)
+
+    if len(labels_xy) == 0:
+        raise ValueError("Can't assign icons to labels when given no labels")
+
+    # Build an (N, M, 2) array of icon-to-label offsets, then pick the label
+    # with the smallest squared distance for each icon
+    offsets = labels_xy[np.newaxis, :, :] - icons_xy[:, np.newaxis, :]
+    return (offsets ** 2).sum(axis=-1).argmin(axis=1)
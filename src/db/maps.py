@@ -4,11 +4,33 @@ Contains methods and classes for interacting with the 'maps' table.
 
 import sqlite3
 
-from typing import Tuple, List, NamedTuple
-from .. import db
+from typing import Iterable, Tuple, List, NamedTuple
 
 from . import exceptions
 
+# Shared by insert_map and insert_maps, so both reuse one cached prepared statement
+_SQL_INSERT_MAP = "INSERT INTO maps VALUES (?, ?)"
+
+# Selects every hex carrying the highest war number in the maps table,
+# alongside the latest war number in the wars table to check it against
+_SQL_SELECT_LATEST_MAPS = """
+    SELECT
+        map_name,
+        war_number,
+        (
+            SELECT
+                MAX(war_number)
+            FROM wars
+        ) AS latest_war
+    FROM maps
+    WHERE 
+        war_number = (
+            SELECT
+                MAX(war_number)
+            FROM maps
+        )
+"""
+
 class Map(NamedTuple):
     """
     Represents a single map uniquely identified in a single war,
@@ -23,9 +45,17 @@ class NoMapsForCurrentWarException(Exception):
     """
     Represents an instance in which a current war exists in the
     database, but no rows in the 'maps' table exist for it.
+
+    Its message is only built if it's actually shown.
     """
-    def __init__(self, *args: object) -> None:
-        super().__init__(*args)
+    def __init__(self, latest_war: int) -> None:
+        super().__init__(latest_war)
+        self.latest_war = latest_war
+
+    def __str__(self) -> str:
+        return \
+            f"No maps found for latest war (#{self.latest_war}). " \
+            "Was PFL-TK initialized correctly?"
 
 def insert_map(
         map_name: str, 
@@ -39,18 +69,37 @@ def insert_map(
         map_name (str): The systematic name of the
         hex in question (e.g. "TheFingersHex")
         war_number (int): The number of the war in which this map exists
-        conn (sqlite3.Connection): A live connection object. Grabs a connection
-        to the application's specified default DB connection string if an
-        alternative isn't specified (usually for testing purposes.)
+        conn (sqlite3.Connection): A live connection object, supplied and
+        closed by the caller. The insert isn't committed here.
     """
-    # Define query and create cursor
-    sql = "INSERT INTO maps VALUES (?, ?)"
-    cursor = conn.cursor()
-
-    # Execute query
+    # Define query and parameters
+    sql = _SQL_INSERT_MAP
     params = map_name, war_number
-    cursor.execute(sql, params)
-    
+
+    # Execute query on the connection, reusing its cached prepared statement
+    conn.execute(sql, params)
+
+
+def insert_maps(
+        maps: Iterable[Tuple[str, int]],
+        conn: sqlite3.Connection
+) -> None:
+    """
+    Inserts many rows into the 'maps' table with a single executemany, such
+    as every hex of a newly synced war. Doesn't commit, leaving the caller
+    to write the whole batch in one transaction.
+
+    Args:
+        maps (Iterable[Tuple[str, int]]): Map NamedTuples, or any
+        tuples in the order (map name, war number)
+        conn (sqlite3.Connection): A live SQLite3 connection object
+    """
+    # Define query
+    sql = _SQL_INSERT_MAP
+
+    # Execute the query once per map
+    conn.executemany(sql, maps)
+
 
 def select_latest_maps(conn: sqlite3.Connection) -> List[Map]:
     """
@@ -58,11 +107,12 @@ def select_latest_maps(conn: sqlite3.Connection) -> List[Map]:
     on the latest known war in the 'wars' table.
 
     Args:
-        conn (sqlite3.connection): A live SQLite3 connection object. If not
-        specified, a connection will be generated automatically based on the
-        application's connection string as specified in the config files.
+        conn (sqlite3.Connection): A live SQLite3 connection object,
+        supplied by the caller and left open whether or not this raises.
 
     Raises:
+        NoDataReturnedException: Raised when there are no rows at all
+        in the 'maps' table, or no wars on record.
         NoMapsForCurrentWarException: Raised when there is no map data
         available for the current war, either because it's outdated or
         because no map data has yet been inserted into the database.
@@ -71,39 +121,28 @@ def select_latest_maps(conn: sqlite3.Connection) -> List[Map]:
         List[Map]: 
         A list of results as [(map_name, war_number), ...]
     """     
-    # Identify the latest war number
-    latest_war, latest_war_fetched_on = db.wars.select_latest_war(conn)
-
-    # Define query and create cursor
-    sql = """
-        SELECT
-            map_name,
-            war_number
-        FROM maps
-        WHERE 
-            war_number = (
-                SELECT
-                    MAX(war_number)
-                FROM maps
-            )
-    """
-    cursor = conn.cursor()
+    # Define query, which looks up the latest war alongside the maps
+    sql = _SQL_SELECT_LATEST_MAPS
 
     # Execute query and fetch to a list of tuples
-    results = cursor.execute(sql).fetchall()
+    rows = conn.execute(sql).fetchall()
 
     # Check if the result set was empty or populated
-    if len(results) == 0:
+    if len(rows) == 0:
         # If there were no results, raise an exception
         message = \
             f"No maps found. Was PFL-TK initialized correctly?"
         raise exceptions.NoDataReturnedException(message)
-    elif max([Map(*map_).war_number for map_ in results]) < latest_war:
+
+    # Every row shares the same war numbers, so checking the first is enough
+    map_war, latest_war = rows[0][1], rows[0][2]
+    if latest_war is None:
         message = \
-            f"No maps found for latest war (#{latest_war}). " \
-            "Was PFL-TK initialized correctly?"
-        raise NoMapsForCurrentWarException(message)
+            f"No wars found. Was PFL-TK initialized correctly?"
+        raise exceptions.NoDataReturnedException(message)
+    elif map_war < latest_war:
+        raise NoMapsForCurrentWarException(latest_war)
     else:
         # Otherwise, return the list of (map_name, war_num) tuples
-        return [Map(*result) for result in results]
+        return [Map._make(row[:2]) for row in rows]
     
@@ -0,0 +1,98 @@
+"""
+Contains a small pool of reusable SQLite connections, split between a
+single writer and a handful of readers, so that callers don't pay for
+opening (and re-tuning) a fresh connection every time they touch the DB.
+"""
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class ConnectionPool:
+    """
+    Hands out long-lived connections built by a factory callable. There is
+    only ever one writer connection, since SQLite allows a single writer at
+    a time anyway, while reads are spread across several connections which
+    WAL mode lets run alongside that writer.
+
+    Connections are opened lazily, the first time each slot is needed.
+    """
+    def __init__(
+            self,
+            factory: Callable[[], sqlite3.Connection],
+            readers: int | None = None
+    ) -> None:
+        """
+        Args:
+            factory (Callable[[], sqlite3.Connection]): Opens a new, fully
+            configured connection whenever the pool needs another one.
+            readers (int | None, optional): How many reader connections to
+            keep. Defaults to the number of CPUs on the host.
+        """
+        self._factory = factory
+        reader_count = readers or os.cpu_count() or 1
+
+        # Each queue starts out full of empty slots; a slot is swapped
+        # for a real connection the first time it's checked out.
+        self._writers: queue.Queue = queue.Queue(maxsize=1)
+        self._writers.put(None)
+
+        self._readers: queue.Queue = queue.Queue(maxsize=reader_count)
+        for _ in range(reader_count):
+            self._readers.put(None)
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Opens a new connection which refuses to modify the database."""
+        conn = self._factory()
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Checks out a read-only connection for the duration of a with block,
+        blocking until one is free.
+
+        Yields:
+            sqlite3.Connection: A live connection which may only be read from
+        """
+        conn = self._readers.get()
+        try:
+            if conn is None:
+                conn = self._open_reader()
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Checks out the pool's writer connection for the duration of a with
+        block, blocking until it's free. Commits when the block exits
+        normally and rolls back if it raises.
+
+        Yields:
+            sqlite3.Connection: The pool's sole writable connection
+        """
+        conn = self._writers.get()
+        try:
+            if conn is None:
+                conn = self._factory()
+            with conn:
+                yield conn
+        finally:
+            self._writers.put(conn)
+
+    def close(self) -> None:
+        """
+        Closes every connection the pool has opened so far, waiting on any
+        which are currently checked out.
+        """
+        for slots in (self._readers, self._writers):
+            for _ in range(slots.maxsize):
+                conn = slots.get()
+                if conn is not None:
+                    conn.close()
+                slots.put(None)
@@ -4,25 +4,187 @@ with the 'tickets' table of the database.
 """
 import sqlite3
 from datetime import datetime
-from typing import NamedTuple
+from typing import Iterable, List, NamedTuple, Set, Tuple
 from .exceptions import \
     UniqueRowNotFoundException, \
     MultipleUniqueRowsException, \
     MapDoesNotExistException, \
     MapDoesNotExistInCurrentWarException, \
     NoDataReturnedException
-from .wars import War
-from .maps import Map
-from .db import DB
+
+
+# Inserts a ticket along with its origin location and description
+_SQL_INSERT_TICKET_FULL = """
+    INSERT INTO tickets (
+        war_number,
+        
+        destination_map_name,
+        destination_x,
+        destination_y,
+        destination_description,
+
+        origin_map_name,
+        origin_x,
+        origin_y,
+        origin_description,
+
+        objective_description,
+        created_on
+    )
+    VALUES (?,?,?,?,?,?,?,?,?,?,?)
+"""
+
+# Inserts a ticket which has no (or only a partial) origin
+_SQL_INSERT_TICKET_NO_ORIGIN = """
+    INSERT INTO tickets (
+        war_number,
+        
+        destination_map_name,
+        destination_x,
+        destination_y,
+        destination_description,
+
+        objective_description,
+        created_on
+    ) VALUES (?,?,?,?,?,?,?)
+"""
+
+# Inserts a single ticket only if it's set in the latest war and its maps
+# exist in that war, so the happy path validates and inserts in one step.
+# Origin values should all be NULL for tickets without a (full) origin.
+_SQL_INSERT_TICKET_GUARDED = """
+    INSERT INTO tickets (
+        war_number,
+
+        destination_map_name,
+        destination_x,
+        destination_y,
+        destination_description,
+
+        origin_map_name,
+        origin_x,
+        origin_y,
+        origin_description,
+
+        objective_description,
+        created_on
+    )
+    SELECT
+        :war_number,
+
+        :destination_map_name,
+        :destination_x,
+        :destination_y,
+        :destination_description,
+
+        :origin_map_name,
+        :origin_x,
+        :origin_y,
+        :origin_description,
+
+        :objective_description,
+        :created_on
+    WHERE
+        :war_number = (SELECT MAX(war_number) FROM wars)
+        AND EXISTS (
+            SELECT 1 FROM maps
+            WHERE
+                map_name = :destination_map_name
+                AND war_number = :war_number
+        )
+        AND (
+            :origin_map_name IS NULL
+            OR EXISTS (
+                SELECT 1 FROM maps
+                WHERE
+                    map_name = :origin_map_name
+                    AND war_number = :war_number
+            )
+        )
+"""
+
+# Has SQLite find the newest war, rather than fetching every one
+_SQL_SELECT_NEWEST_WAR = "SELECT MAX(war_number) FROM wars"
+
+# Checks for a map in any war and in one war, each of which can stop at
+# the first matching row of the primary key index
+_SQL_SELECT_MAP_EXISTENCE = """
+    SELECT
+        EXISTS (
+            SELECT 1 FROM maps WHERE map_name = :map_name
+        ),
+        EXISTS (
+            SELECT 1 FROM maps
+            WHERE
+                map_name = :map_name
+                AND war_number = :war_number
+        )
+"""
+
+# Selects every map in a single war, to check a batch of tickets against
+_SQL_SELECT_MAPS_IN_WAR = """
+    SELECT
+        map_name,
+        war_number
+    FROM maps
+    WHERE war_number = ?
+"""
+
+# Selects every column but the ticket number, so rows match the Ticket fields
+_SQL_SELECT_TICKET = """
+    SELECT
+        war_number,
+
+        destination_map_name,
+        destination_x,
+        destination_y,
+        destination_description,
+
+        origin_map_name,
+        origin_x,
+        origin_y,
+        origin_description,
+
+        objective_description,
+        created_on
+    FROM tickets
+    WHERE ticket_number = ?
+"""
 
 
 class CannotCreateTicketForWarException(Exception):
     """
     Represents an instance where a ticket cannot be created for a specified
     war, either because that war specified is in the past or future.
+
+    Its message is only built if it's actually shown.
     """
-    def __init__(self, *args: object) -> None:
-        super().__init__(*args)
+    def __init__(
+            self,
+            war_number: int,
+            latest_war_number: int | None = None
+        ) -> None:
+        """
+        Args:
+            war_number (int): The war in which the ticket was to be set
+            latest_war_number (int | None, optional): The latest war on
+            record, if known. Defaults to None.
+        """
+        super().__init__(war_number, latest_war_number)
+        self.war_number = war_number
+        self.latest_war_number = latest_war_number
+
+    def __str__(self) -> str:
+        if self.latest_war_number is None:
+            return f"Ticket for war #{self.war_number} could not be inserted."
+        elif self.war_number < self.latest_war_number:
+            return \
+                f"Cannot create ticket; war #{self.war_number}" \
+                f" is earlier than current war #{self.latest_war_number}."
+        else:
+            return \
+                f"Cannot create ticket set in war #{self.war_number}," \
+                f" as the latest war on record is #{self.latest_war_number}."
 
 class Ticket(NamedTuple):
     """Represents a single Ticket as it exists in memory or in the database."""
@@ -45,6 +207,81 @@ class Ticket(NamedTuple):
     objective_description: str
     created_on: datetime
 
+def _assert_war_is_real_and_current(
+    war_number: int,
+    conn: sqlite3.Connection
+) -> None:
+    """
+    Throws exceptions if there are no wars, or if the specified war
+    does not correspond to the active war as per the 'wars' table.
+    """
+    # Define query and fetch the newest war
+    query = _SQL_SELECT_NEWEST_WAR
+    newest_war = conn.execute(query).fetchone()[0]
+
+    # Check for an empty wars table
+    if newest_war is None:
+        message = \
+            "No data found in table 'wars'. " \
+            "Was the app initialized correctly?"
+        raise NoDataReturnedException(message)
+
+    # Check for a past or future war
+    if war_number != newest_war:
+        raise CannotCreateTicketForWarException(war_number, newest_war)
+
+def _assert_map_is_real_and_current(
+    map_name: str,
+    war_number: int,
+    conn: sqlite3.Connection
+) -> None:
+    """
+    Throws an exception a specified origin or destination map doesn't
+    exist, either in the current war or in the database entirely.
+    """
+    # Define query and parameters, and check for the map
+    query = _SQL_SELECT_MAP_EXISTENCE
+    params = {"map_name": map_name, "war_number": war_number}
+    in_any_war, in_this_war = conn.execute(query, params).fetchone()
+
+    if not in_any_war:
+        message = \
+            f"No map by the name {map_name} exists" \
+            " in the 'maps' for any war on record."
+        raise MapDoesNotExistException(message)
+    elif not in_this_war:
+        message = \
+            f"No map found named {map_name} for current war #{war_number}."
+        raise MapDoesNotExistInCurrentWarException(message)
+
+def _ticket_from_row(cursor: sqlite3.Cursor, row: tuple) -> Ticket:
+    """Row factory which has a cursor return its rows as Tickets."""
+    return Ticket._make(row)
+
+def _has_valid_origin(ticket: Ticket) -> bool:
+    """
+    Whether a ticket has all four of the values needed to store its origin.
+    """
+    return \
+        ticket.origin_map_name is not None \
+        and ticket.origin_x is not None \
+        and ticket.origin_y is not None \
+        and ticket.origin_description is not None
+
+def _no_origin_params(ticket: Ticket) -> tuple:
+    """
+    Parameters for _SQL_INSERT_TICKET_NO_ORIGIN, leaving out the origin.
+    """
+    return (
+        ticket.war_number,
+        ticket.destination_map_name,
+        ticket.destination_x,
+        ticket.destination_y,
+        ticket.destination_description,
+        ticket.objective_description,
+        ticket.created_on
+    )
+
 def insert_ticket(
     ticket: Ticket, 
     conn: sqlite3.Connection
@@ -54,151 +291,123 @@ def insert_ticket(
     Will include an origin location and description if provided with
     all 4 related arguments, but ignores it if missing any of them.
 
+    Doesn't commit; callers should insert within a transaction of their
+    own, e.g. a `with conn:` block or the DB's pooled writer.
+
     Args:
         ticket (Ticket): A Ticket object to be inserted
         conn (sqlite3.Connection): A connection to a database hosting
         this application into which this ticket will be inserted.
 
+    Raises:
+        NoDataReturnedException: Raised if there are no wars on record
+        CannotCreateTicketForWarException: Raised if the ticket's war
+        isn't the latest one on record
+        MapDoesNotExistException: Raised if a map isn't in any war on record
+        MapDoesNotExistInCurrentWarException: Raised if a map isn't in
+        the ticket's war
+
     Returns:
         int: The ticket ID of the newly created row
     """
-    def _assert_war_is_real_and_current(
-        war_number: int,
-        conn: sqlite3.Connection
-    ):
-        """
-        Throws exceptions if there are no wars, or if the specified war
-        does not correspond to the active war as per the 'wars' table.
-        """
-        query = """SELECT * FROM wars"""
-        cursor = conn.cursor()
-
-        cursor.execute(query)
-        wars = [War(*row) for row in cursor.fetchall()]
-
-        # Check for an empty wars table
-        if len(wars) == 0:
-            message = \
-                "No data found in table 'wars'. " \
-                "Was the app initialized correctly?"
-            raise NoDataReturnedException(message)
-        
-        # Check for a past or future war
-        newest_war = max([war.war_number for war in wars])
-        if war_number < newest_war:
-            message = \
-                f"Cannot create ticket; war #{war_number}" \
-                f" is earlier than current war #{newest_war}."
-            raise CannotCreateTicketForWarException(message)
-        elif war_number > newest_war:
-            message = \
-                f"Cannot create ticket set in war #{war_number},"\
-                f" as the latest war on record is #{newest_war}."
-            raise CannotCreateTicketForWarException(message)
-
-    def _assert_map_is_real_and_current(
-        map_name: str,
-        war_number: int,
-        conn: sqlite3.Connection
-    ):
-        """
-        Throws an exception a specified origin or destination map doesn't
-        exist, either in the current war or in the database entirely.
-        """
-        # Define query and get cursor
-        query = "SELECT map_name, war_number FROM maps"
-        cursor = conn.cursor()
-        cursor.execute(query)
-        maps = [Map(*map_) for map_ in cursor.fetchall()]
-
-        print(maps)
-
-        if map_name not in set([map_.map_name for map_ in maps]):
-            message = \
-                f"No map by the name {map_name} exists" \
-                " in the 'maps' for any war on record."
-            raise MapDoesNotExistException(message)
-        elif Map(map_name, war_number) not in maps:
-            message = \
-                f"No map found named {map_name} for current war #{war_number}."
-            raise MapDoesNotExistInCurrentWarException(message)
-
-    # Perform exception checking for everything except origin
+    # Determine whether we have all the data to submit the origin
+    has_valid_origin = _has_valid_origin(ticket)
+
+    # Define the guarded query and its parameters, blanking out the
+    # origin entirely unless all of it was given
+    query = _SQL_INSERT_TICKET_GUARDED
+    if has_valid_origin:
+        params = ticket._asdict()
+    else:
+        params = ticket._replace(
+            origin_map_name=None,
+            origin_x=None,
+            origin_y=None,
+            origin_description=None
+        )._asdict()
+
+    # Execute the query, noting whether it's the one to open a transaction
+    already_in_transaction = conn.in_transaction
+    cursor = conn.execute(query, params)
+
+    # If the guard let the row through, return its ID
+    if cursor.rowcount == 1:
+        return cursor.lastrowid
+
+    # Otherwise nothing was written. Close the transaction if this call
+    # opened it, then run the individual checks to raise the specific
+    # exception for what was wrong.
+    if not already_in_transaction:
+        conn.rollback()
+
     _assert_war_is_real_and_current(ticket.war_number, conn)
     _assert_map_is_real_and_current(
         map_name=ticket.destination_map_name,
         war_number=ticket.war_number,
         conn=conn)
-
-    # Determine whether we have all the data to submit the origin
-    has_valid_origin = \
-        ticket.origin_map_name is not None \
-        and ticket.origin_x is not None \
-        and ticket.origin_y is not None \
-        and ticket.origin_description is not None
-    
-    # Perform exception checking--if appropriate--for origin as well
     if has_valid_origin:
         _assert_map_is_real_and_current(
             map_name=ticket.origin_map_name,
             war_number=ticket.war_number,
             conn=conn)
-    
-    if has_valid_origin:
-        # If given a valid origin, use the full query
-        query = """
-            INSERT INTO tickets (
-                war_number,
-                
-                destination_map_name,
-                destination_x,
-                destination_y,
-                destination_description,
-
-                origin_map_name,
-                origin_x,
-                origin_y,
-                origin_description,
-
-                objective_description,
-                created_on
-            )
-            VALUES (?,?,?,?,?,?,?,?,?,?,?)
-        """
-        params = ticket
-    else:
-        # If not given a full valid origin, just submit the rest
-        query = """
-            INSERT INTO tickets (
-                war_number,
-                
-                destination_map_name,
-                destination_x,
-                destination_y,
-                destination_description,
-
-                objective_description,
-                created_on
-            ) VALUES (?,?,?,?,?,?,?)
-        """
-        params = (
-            ticket.war_number,
-            ticket.destination_map_name,
-            ticket.destination_x,
-            ticket.destination_y,
-            ticket.destination_description,
-            ticket.objective_description,
-            ticket.created_on
-        )
-        
-    
-    # In either case: create a cursor and execute the query
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    conn.commit()
 
-    # Return the cursor's lastrowid to identify the new row
-    return cursor.lastrowid
+    # The checks above cover every condition of the guard, so this is
+    # only reached if the data changed underneath us in the meantime
+    raise CannotCreateTicketForWarException(ticket.war_number)
+
+def insert_tickets(
+    tickets: Iterable[Ticket],
+    conn: sqlite3.Connection
+) -> None:
+    """
+    Inserts many tickets at once, validating each distinct war and map
+    only once and then writing the tickets with one executemany apiece
+    for those with and without an origin. As with insert_ticket, origins
+    missing any of their 4 values are ignored.
+
+    Doesn't commit, so that the whole batch can share the caller's
+    transaction. If any ticket fails validation, nothing is inserted.
+
+    Args:
+        tickets (Iterable[Ticket]): The Ticket objects to be inserted
+        conn (sqlite3.Connection): A connection to a database hosting
+        this application into which these tickets will be inserted.
+    """
+    # Sort the tickets by shape, noting which wars and maps they refer to
+    with_origin: List[Ticket] = []
+    without_origin: List[Ticket] = []
+    wars: Set[int] = set()
+    maps: Set[Tuple[str, int]] = set()
+    for ticket in tickets:
+        wars.add(ticket.war_number)
+        maps.add((ticket.destination_map_name, ticket.war_number))
+
+        if _has_valid_origin(ticket):
+            maps.add((ticket.origin_map_name, ticket.war_number))
+            with_origin.append(ticket)
+        else:
+            without_origin.append(ticket)
+
+    # Check each war once, however many tickets share it. Past here,
+    # every ticket is known to be set in the current war.
+    for war_number in wars:
+        _assert_war_is_real_and_current(war_number, conn)
+
+    # Fetch the current war's maps once and check each ticket's against
+    # them, only querying further to explain any which are missing
+    if wars:
+        current_war = wars.pop()
+        query = _SQL_SELECT_MAPS_IN_WAR
+        current_maps = set(conn.execute(query, (current_war,)))
+        for map_name, war_number in maps - current_maps:
+            _assert_map_is_real_and_current(map_name, war_number, conn)
+
+    # Insert each shape of ticket with its own statement
+    conn.executemany(_SQL_INSERT_TICKET_FULL, with_origin)
+    conn.executemany(
+        _SQL_INSERT_TICKET_NO_ORIGIN,
+        map(_no_origin_params, without_origin)
+    )
 
 def select_ticket(
     ticket_number: int,
@@ -216,22 +425,23 @@ def select_ticket(
         Ticket: A Ticket NamedTuple containing the specified row
     """
     # Define query and (single-element) parameters tuple
-    query = "SELECT * FROM tickets WHERE ticket_number = ?"
+    query = _SQL_SELECT_TICKET
     params = (ticket_number,)
 
-    # Get cursor and execute query
-    cursor = conn.cursor()
-    results = cursor.execute(query, params).fetchall()
+    # Execute query, having the cursor build rows as Tickets, and fetch
+    # only the first result rather than a list of them
+    cursor = conn.execute(query, params)
+    cursor.row_factory = _ticket_from_row
+    ticket = cursor.fetchone()
 
     # Throw an exception if zero or more than one result were returned
-    if len(results) == 0:
+    if ticket is None:
         message = f"No ticket found with ID {ticket_number}"
         raise UniqueRowNotFoundException(message)
-    elif len(results) > 1:
+    elif cursor.fetchone() is not None:
         message = f"Duplicate rows found for unique ticket ID {ticket_number}"
         raise MultipleUniqueRowsException(message)
     
-    # Otherwise, return the result as a named tuple (excluding the ID).
-    # Be sure as well to re-format its date type.
-    result = results[0]
-    return Ticket(*result[1:-1], DB.format_date_from_db(result[-1]))
+    # Otherwise, return the sole result. Its created_on
+    # value already comes back as a datetime.
+    return ticket
@@ -2,7 +2,33 @@
 import sqlite3
 from enum import Enum
 from typing import NamedTuple
-from exceptions import UniqueRowNotFoundException
+from .exceptions import UniqueRowNotFoundException
+
+# Gives a user a role on a server, replacing any role they already had
+_SQL_UPSERT_USER_ROLE = """
+    INSERT INTO users (user_id, guild, role)
+    VALUES (?, ?, ?)
+    ON CONFLICT (user_id, guild) DO UPDATE
+    SET role = excluded.role
+"""
+
+# Selects a user's role on a single server
+_SQL_SELECT_USER_ROLE = """
+    SELECT
+        role
+    FROM users
+    WHERE 
+        user_id = ?
+        AND guild = ?
+"""
+
+# Removes a user's role on a single server
+_SQL_DELETE_USER_ROLE = """
+    DELETE FROM users
+    WHERE 
+        user_id=?
+        AND guild=?
+"""
 
 class Role(Enum):
     """
@@ -34,24 +60,24 @@ class User(NamedTuple):
     guild: str
     role: Role
 
-def insert_user_role_on_server(user: User, conn: sqlite3.connection) -> None:
+def insert_user_role_on_server(user: User, conn: sqlite3.Connection) -> None:
     """
     Inserts a new row into the 'users' table, provided with the user's
     discord ID, the role to give them, and the server on which to give it.
+    If the user already has a role on that server, it's replaced instead.
 
     Args:
         user (User): A NamedTuple of user_id, server, and role to assign
-        conn (sqlite3.connection): An active SQLite3 connection to the
+        conn (sqlite3.Connection): An active SQLite3 connection to the
         application database, onto which to insert this row.
     """
     # Generate query and assign parameters, making sure to get
     # the value of the enumerated argument instead of its name
-    query = "INSERT INTO users VALUES (?, ?, ?)"
-    params = (*user[0:2], user[2].name)
+    query = _SQL_UPSERT_USER_ROLE
+    params = (user.user_id, user.guild, user.role.value)
 
-    # Create a cursor and execute the query
-    cursor = conn.cursor()
-    cursor.execute(query, params)
+    # Execute the query
+    conn.execute(query, params)
 
 def select_user_role_on_server(user_id: int, guild: str, conn: sqlite3.Connection) -> Role:
     """
@@ -73,29 +99,20 @@ def select_user_role_on_server(user_id: int, guild: str, conn: sqlite3.Connectio
         Role: An enumerative value corresponding to the user's role
     """    
     # Define query and parameters
-    query = """
-        SELECT
-            role
-        FROM users
-        WHERE 
-            user_id = ?
-            AND guild = ?
-    """
+    query = _SQL_SELECT_USER_ROLE
     params = (user_id, guild)
 
-    # Get cursor, execute query, and fetch results
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+    # Execute query and fetch the sole result, if any
+    row = conn.execute(query, params).fetchone()
 
     # Raise an exception if no results were returned
-    if len(results) == 0:
+    if row is None:
         message = f"No user role found for user {user_id} on server {guild}."
         raise UniqueRowNotFoundException(message)
     
-    # Otherwise return the sole result as an enum value
+    # Otherwise look the stored value up as an enum member
     else:
-        return Role[results[0]]
+        return Role(row[0])
 
 def delete_user_role_on_server(
     user_id: int,
@@ -113,14 +130,8 @@ def delete_user_role_on_server(
         connected to the application database, from which to delete.
     """    
     # Define query and parameters
-    query = """
-        DELETE FROM users
-        WHERE 
-            user_id=?
-            AND guild=?
-    """
+    query = _SQL_DELETE_USER_ROLE
     params = (user_id, guild)
 
-    # Create cursor and execute query
-    cursor = conn.cursor()
-    cursor.execute(query, params)    
+    # Execute query
+    conn.execute(query, params)    
@@ -4,14 +4,48 @@ Contains methods and classes for interacting with the 'wars' table.
 
 import sqlite3
 import datetime
-from . import db as data
+import time
+import weakref
 
 from typing import Tuple, NamedTuple
-from .exceptions import \
-    UniqueRowNotFoundException, \
-    MultipleUniqueRowsException, \
-    UniqueRowAlreadyExistsException, \
-    NoDataReturnedException
+from .exceptions import UniqueRowAlreadyExistsException
+
+# Records a new war, when it was pulled from the API, and the ETag of the
+# /war response it came from. war_number is the primary key, so SQLite
+# itself refuses a war which is already on record.
+_SQL_INSERT_WAR = """
+    INSERT INTO wars
+    VALUES (
+        ?,
+        ?,
+        ?
+    )
+"""
+
+# Replaces the ETag kept for a war already on record, for when the API's
+# /war response has changed without the war itself having changed
+_SQL_UPDATE_WAR_ETAG = """
+    UPDATE wars
+    SET etag = ?
+    WHERE war_number = ?
+"""
+
+# Selects the row for the highest war number on record. war_number is the
+# table's INTEGER PRIMARY KEY, so SQLite reads this straight off the end of
+# the rowid b-tree, and the primary key means there can only be one such row.
+_SQL_SELECT_LATEST_WAR = """
+    SELECT 
+        war_number,
+        last_fetched_on,
+        etag
+    FROM wars
+    ORDER BY war_number DESC
+    LIMIT 1
+"""
+
+# How many seconds latest_war() may keep reusing the war it last found for
+# a connection, in case a newer war is recorded through another connection
+LATEST_WAR_TTL = 5.0
 
 class War(NamedTuple):
     """
@@ -21,6 +55,12 @@ class War(NamedTuple):
     """
     war_number: int
     pulled_on: datetime.datetime
+    etag: str | None = None
+
+# The latest war last found on each connection, as (expiry time, war).
+# Held weakly so that closed and discarded connections drop out by themselves.
+_latest_war_memo: "weakref.WeakKeyDictionary[sqlite3.Connection, Tuple[float, War]]" = \
+    weakref.WeakKeyDictionary()
 
 class NewerWarAlreadyExistsException(Exception):
     """
@@ -40,11 +80,15 @@ class NewerWarAlreadyExistsException(Exception):
 def insert_war(
         war_number: int,
         last_fetched_on: datetime.datetime,
-        conn: sqlite3.Connection):
+        conn: sqlite3.Connection,
+        etag: str | None = None):
     """
     Inserts a new row into the 'wars' table representing a new war
     on the server being monitored by this instance of the ticker.
 
+    A war which already exists is caught by the primary key as the row
+    is inserted, rather than being looked for beforehand.
+
     Args:
         war_number (int):
             The integer number of the new war
@@ -52,60 +96,43 @@ def insert_war(
             When this data was pulled from the API
         conn (sqlite3.Connection):
             An open SQLite3 connection object
+        etag (str | None, optional):
+            The ETag of the /war response this war was read from, if any.
+            Defaults to None.
+
+    Raises:
+        ValueError: If war_number is negative
+        NewerWarAlreadyExistsException: If a later war is already on record
+        UniqueRowAlreadyExistsException: If this war is already on record
     """
-    def _war_already_exists(war_num: int) -> bool:
-        """
-        Local function to test whether a war already exists in the database.
-        """
-        does_it_exist_sql = """
-            SELECT * FROM wars
-            WHERE war_number = ?
-        """
-        cursor = conn.cursor()
-        cursor.execute(
-            does_it_exist_sql, 
-            (war_num,)
-        )
-        results = cursor.fetchall()
-        if len(results) > 1:
-            raise MultipleUniqueRowsException(f"Multiple rows exist for unique war number {war_number}")
-        else:
-            return len(results) == 1
-        
-    def _submit_new_war(war_number, last_fetched_on) -> None:
+    def _submit_new_war(war_number, last_fetched_on, etag) -> None:
         """
         Local function which creates a new row in the 'wars' table.
         """
         # Define query text
-        sql = """
-            INSERT INTO wars
-            VALUES (
-                ?,
-                ?
+        sql = _SQL_INSERT_WAR
+
+        # Execute the command, reusing the connection's prepared statement,
+        # and report a clash with the primary key as a duplicate war. The
+        # failed insert leaves its transaction open, so close it if this
+        # call was the one to open it.
+        already_in_transaction = conn.in_transaction
+        try:
+            conn.execute(
+                sql,
+                (war_number, last_fetched_on, etag,)
             )
-        """
+        except sqlite3.IntegrityError as e:
+            if not already_in_transaction:
+                conn.rollback()
 
-        # Parse fetched-on date
-        fetched_on_str = data.DB.format_date_for_db(last_fetched_on)
-        
-        # Get cursor and execute
-        cursor = conn.cursor()
-        
-        # Execute the command
-        cursor.execute(
-            sql,
-            (war_number, fetched_on_str,)
-        )
+            message = f"Entry for war number {war_number} already exists"
+            raise UniqueRowAlreadyExistsException(message) from e
     
     # Assure the war number is valid
     if (war_number < 0):
         raise ValueError("war_number must be an integer not less than 0")
     
-    # See if this war already exists
-    if (_war_already_exists(war_number)):
-        message = f"Entry for war number {war_number} already exists"
-        raise UniqueRowAlreadyExistsException(message)
-    
     # See if a more recent war already exists
     latest_war_tuple: Tuple[int, datetime.datetime] | None = \
         select_latest_war(conn)
@@ -120,48 +147,92 @@ def insert_war(
             latest_war_number=latest_war_tuple[0]
         )
     
-    # If neither rejecting condition is true, submit the given row
-    _submit_new_war(war_number, last_fetched_on)
+    # If no newer war exists, submit the given row
+    _submit_new_war(war_number, last_fetched_on, etag)
+
+    # Any latest war remembered by latest_war() is now out of date
+    _latest_war_memo.clear()
     
 
+def update_war_etag(
+        war_number: int,
+        etag: str | None,
+        conn: sqlite3.Connection) -> None:
+    """
+    Replaces the ETag stored for a war already on record, so that the next
+    conditional /war request is made against the API's latest response.
+
+    Args:
+        war_number (int): The number of the war to update
+        etag (str | None): The ETag of the latest /war response, if any
+        conn (sqlite3.Connection): An open SQLite3 connection object
+    """
+    conn.execute(_SQL_UPDATE_WAR_ETAG, (etag, war_number))
+
+    # Any latest war remembered by latest_war() now has the wrong ETag
+    _latest_war_memo.clear()
+
+
 def select_latest_war(conn: sqlite3.Connection) -> War | None:
     """
-    Selects the number of the latest war, as well as when that data was pulled.
+    Selects the number of the latest war, as well as when that data was
+    pulled and the ETag of the /war response it was pulled from.
 
     Will return None if there are no wars in the database when called.
 
     Returns:
-        Tuple[int, datetime.datetime] | None: 
-        A tuple of (war number, date pulled) corresponding to the highest
-        war number recorded in the 'wars' table and when it was added.
-        None if no values were found.
+        War | None: 
+        A named tuple of (war number, date pulled, ETag) corresponding to
+        the highest war number recorded in the 'wars' table and when it
+        was added. None if no values were found.
     """    
-    # We use this format rather than a SELECT TOP (1) query so we can
-    # add verification that there's only one entry for the current war.
-    latest_war_sql = """
-        SELECT 
-            war_number,
-            last_fetched_on
-        FROM wars
-        WHERE war_number = (
-            SELECT MAX(war_number) FROM wars
-        )
-    """
-
-    # Spin up a cursor and get the results
-    cursor = conn.cursor()
-    results = cursor.execute(latest_war_sql).fetchall()
+    # Execute the query and fetch its one result, if any
+    result = conn.execute(_SQL_SELECT_LATEST_WAR).fetchone()
 
-    # Check how many results we got, expecting zero or one.
-    if len(results) > 1:
-        # Throw an exception if we somehow got multiple unique rows
-        message = "Multiple results found for latest war; error likely"
-        raise MultipleUniqueRowsException(message)
-    elif len(results) == 0:
+    if result is None:
         # Return None if there's no data
         return None
     else:
-        # Otherwise, return a named tuple of (war_number, date_pulled)
-        war_num, pulled_on = results[0][0], data.DB.format_date_from_db(results[0][1])
-        return War(war_num, pulled_on)
+        # Otherwise, return a named tuple of (war_number, date_pulled, etag)
+        return War._make(result)
     
+
+def latest_war(conn: sqlite3.Connection) -> War | None:
+    """
+    Returns the latest war, as select_latest_war() does, but remembers it
+    for each connection so that code which needs the current war on every
+    call doesn't query for it every time. Remembered wars are forgotten
+    whenever insert_war() records a new one, and after LATEST_WAR_TTL
+    seconds in any case.
+
+    Plain sqlite3 connections can't be remembered, and so are always
+    queried; those from DB.get_connection() can.
+
+    Args:
+        conn (sqlite3.Connection): A live SQLite3 connection object
+
+    Returns:
+        War | None: A named tuple of (war number, date pulled, ETag) for the
+        highest war number on record, or None if there are no wars.
+    """
+    now = time.monotonic()
+
+    # Reuse the war last found on this connection, if it's still fresh
+    try:
+        expires_at, war = _latest_war_memo[conn]
+    except (KeyError, TypeError):
+        pass
+    else:
+        if expires_at > now:
+            return war
+
+    # Otherwise look it up, and remember it if there was one
+    war = select_latest_war(conn)
+    if war is not None:
+        try:
+            _latest_war_memo[conn] = (now + LATEST_WAR_TTL, war)
+        except TypeError:
+            # The connection can't be weakly referenced
+            pass
+
+    return war
@@ -2,35 +2,72 @@
 Contains methods and classes used when setting up the
 service both for the first time and for a new war. 
 """
+import asyncio
 import sqlite3
 import config
 from .. import db
-from ..db import War, Map, Label, Icon
+from ..db import War, Map
 from .. import warAPI as api
-from typing import Tuple, List
+from typing import Iterator, NamedTuple, Tuple, List
 from datetime import datetime
 
+# Lists the columns of the 'wars' table, which is none at all if it
+# hasn't been created yet
+_SQL_WARS_TABLE_INFO = "PRAGMA table_info(wars)"
+
+# Selects the latest war from a 'wars' table made before it had an etag
+_SQL_SELECT_LATEST_WAR_WITHOUT_ETAG = """
+    SELECT
+        war_number,
+        last_fetched_on
+    FROM wars
+    ORDER BY war_number DESC
+    LIMIT 1
+"""
+
+class WarUpdate(NamedTuple):
+    """
+    Everything fetched from the War API for a war newer than the latest
+    one on record, ready to be written to the database by write_war().
+
+    When the war is the one already on record, and only the ETag of the
+    API's /war response has changed, maps, labels_per_hex, and
+    icons_per_hex are all None.
+    """
+    war: War
+    maps: List[Map] | None
+    labels_per_hex: List[Iterator[Tuple]] | None
+    icons_per_hex: List[Iterator[Tuple]] | None
+
 def execute_cold_start(connection_string: str = config.db_connection_string):
     """
     Initializes database, loads static resources to it, and runs sync_war().
 
+    Every War API request is made before the database is written to, so the
+    write lock is only held for the schema and the inserts themselves.
+
     Args:
         connection_string (str, optional): DB connection string. 
         Defaults to config.db_connection_string.
     """    
-    # Create database connection
     data = db.DB(connection_string)
-    conn = data.get_connection()
 
-    # Implement database schema
-    data.generate_db()
+    # Fetch the current war's data first, going by the latest war on record
+    # if the database has already been initialized
+    with data.reader() as conn:
+        latest_war_in_db = _select_latest_war_if_any(conn)
+    update = fetch_war(latest_war_in_db)
 
-    # Synchronize with the current war
-    sync_war(conn)
+    # Borrow the database's pooled writer connection, which commits the
+    # changes when the block exits only if no issues at all occurred
+    with data.writer() as conn:
+        # Implement database schema, leaving its transaction open so
+        # that the schema and the first war are committed together
+        data.generate_db_from_conn(conn, commit=False)
 
-    # If no issues at all occurred, commit the changes
-    conn.commit()
-    conn.close()
+        # Write out the current war, if it's newer than the one on record
+        if update is not None:
+            write_war(update, conn)
 
 def sync_war(conn: sqlite3.Connection) -> None:
     """
@@ -40,72 +77,213 @@ def sync_war(conn: sqlite3.Connection) -> None:
     war on record, and will rollback if any issues are encountered in
     populating the database for the new war.
 
+    The /war request is a conditional one, made with the ETag stored
+    alongside the latest war, so once a database is in sync with a war,
+    later calls return as soon as the API answers that it hasn't changed.
+
+    Fetches through fetch_war(), and so can't be called from within a
+    running event loop. Code which runs in one, such as the bot's, should
+    await fetch_war_async() and pass its result to write_war() instead.
+
     Args:
-        connection_string (str, optional): Conn string for the
-        database in which the application should be initialized.
-        Defaults to config.db_connection_string, but can be set
-        to an alternative value for testing purposes.
+        conn (sqlite3.Connection): A live, writable connection to the
+        database in which the application has been initialized.
+
+    Raises:
+        RuntimeError: If called from within a running event loop
+    """
+    # Check the latest war in the database, and fetch anything newer. A
+    # plain SELECT doesn't open a transaction, so no lock is held while
+    # the API is being waited on.
+    update = fetch_war(db.wars.select_latest_war(conn))
+    if update is None:
+        return
+
+    # If this -is- a newer war (or a new ETag for the same one), we'll
+    # start making changes to the database here, all in one transaction
+    # which commits only if every one of them succeeds and rolls back
+    # otherwise.
+    with conn:
+        write_war(update, conn)
+
+def fetch_war(latest_war_in_db: War | None) -> WarUpdate | None:
     """
-    # Fetch latest war data from the API
-    current_war = War(*api.get_war())
+    Fetches the current war from the War API, along with its map hex names
+    and every hex's labels and icons, if it's newer than the given war.
+    Makes no use of the database, so that it can run before any write
+    transaction is opened.
 
-    # Check the latest war in the database
-    latest_war_in_db = db.wars.select_latest_war(conn)
+    Runs fetch_war_async() in an event loop of its own, and so can't be
+    called from code already running in one, such as the bot's. Await
+    fetch_war_async() there instead.
+
+    Args:
+        latest_war_in_db (War | None): The latest war on record, or None
+        if there isn't one yet
+
+    Raises:
+        RuntimeError: If called from within a running event loop
+
+    Returns:
+        WarUpdate | None: The current war's data, just the war itself if
+        only its ETag has changed, or None if there's nothing to update
+    """
+    return asyncio.run(fetch_war_async(latest_war_in_db))
+
+async def fetch_war_async(latest_war_in_db: War | None) -> WarUpdate | None:
+    """
+    Works as fetch_war() does, but is awaited on the caller's own event
+    loop. The blocking /war and /maps requests run in worker threads, so
+    the loop is free while they wait on the network.
+
+    Args:
+        latest_war_in_db (War | None): The latest war on record, or None
+        if there isn't one yet
+
+    Returns:
+        WarUpdate | None: The current war's data, just the war itself if
+        only its ETag has changed, or None if there's nothing to update
+    """
+    # Fetch latest war data from the API, unless it's unchanged since the
+    # latest war on record was synced
+    etag = latest_war_in_db.etag if latest_war_in_db is not None else None
+    result = await asyncio.to_thread(api.get_war_if_modified, etag)
+    if result is None:
+        return None
+
+    current_war = War(*result)
 
     # If the war we pulled isn't newer, break here--ignoring the
-    # check if there is no previous war and the call returned None
+    # check if there is no previous war and the call returned None.
+    # Should the API have sent a new ETag for the same war, though, it's
+    # kept in place of the old one, so later requests can still be
+    # answered with a 304.
     if latest_war_in_db is None:
         pass
+    elif current_war.war_number == latest_war_in_db.war_number \
+            and current_war.etag != latest_war_in_db.etag:
+        return WarUpdate(current_war, None, None, None)
     elif not (current_war.war_number > latest_war_in_db.war_number):
-        return
+        return None
     
-    # If this -is- a newer war, we'll start making changes to the
-    # database here and commit them only if all of them succeed.
+    # Get the map hex names for the current war, which are only requested
+    # once per war even if this sync has to be retried
+    hex_names: Tuple[str, ...] = await asyncio.to_thread(
+        api.get_maps_for_war, current_war.war_number)
+    api.precompute_map_urls(hex_names)
+    maps: List[Map] = [Map(hex, current_war.war_number) for hex in hex_names]
 
-    # Create a new row in the 'wars' table for the current war
-    db.wars.insert_war(*current_war, conn)
+    # Fetch every hex's labels and icons concurrently, since each request
+    # spends nearly all of its time waiting on the network
+    labels_per_hex, icons_per_hex = await _fetch_hexes(maps)
 
-    # Get the list of map hex names for the current war
-    hex_names: List[str] = api.get_maps()
-    maps: List[Map] = [Map(hex, current_war.war_number) for hex in hex_names]
+    return WarUpdate(current_war, maps, labels_per_hex, icons_per_hex)
+
+def write_war(update: WarUpdate, conn: sqlite3.Connection) -> None:
+    """
+    Inserts a war fetched by fetch_war(), with its maps, labels, and icons,
+    or only updates its ETag if it's already on record. Does not commit, so
+    that the caller can decide which transaction the rows are written in.
+
+    Args:
+        update (WarUpdate): The war and map data returned by fetch_war()
+        conn (sqlite3.Connection): A live, writable database connection
+    """
+    # A war already on record only needs its ETag brought up to date
+    if update.maps is None:
+        db.wars.update_war_etag(update.war.war_number, update.war.etag, conn)
+        return
+
+    # Create a new row in the 'wars' table for the current war, keeping
+    # the ETag of the /war response it was read from for the next sync
+    db.wars.insert_war(
+        update.war.war_number,
+        update.war.pulled_on,
+        conn,
+        etag=update.war.etag
+    )
+
+    # Add every hex to the 'maps' table at once
+    db.maps.insert_maps(update.maps, conn)
+
+    # Add each map's labels and icons to the database. Both were fetched
+    # as iterators of rows, built from each decoded response only as
+    # executemany draws them, with no Python-level code run per row.
+    for labels, icons in zip(update.labels_per_hex, update.icons_per_hex):
+        # The major & minor map labels for this hex map were fetched as
+        # rows of (map name, war number, label, x, y). Insert them,
+        # letting executemany drain the iterator itself rather than
+        # building a list of them first.
+        db.labels.insert_labels(labels, conn)
+
+        # The icons are rows of (map name, war number, x, y, icon
+        # type, icon flags bitmask). Insert them straight from the
+        # iterator as well.
+        db.icons.insert_icons(icons, conn)
+
+    # Refresh the query planner's statistics now that the tables have
+    # grown by a whole war's worth of rows, so it keeps picking indexes
+    conn.execute("ANALYZE")
+
+
+def _select_latest_war_if_any(conn: sqlite3.Connection) -> War | None:
+    """
+    Returns the latest war on record, or None if there isn't one, including
+    when the database's schema hasn't been created yet. Any other error in
+    reading it is raised, rather than mistaken for there being no war.
+    """
+    columns = {row[1] for row in conn.execute(_SQL_WARS_TABLE_INFO)}
+
+    # There's no 'wars' table until the first cold start creates it
+    if not columns:
+        return None
+
+    # A table from before wars had ETags is only brought up to date in the
+    # schema transaction, after fetching, so read it as it is until then
+    if "etag" not in columns:
+        row = conn.execute(_SQL_SELECT_LATEST_WAR_WITHOUT_ETAG).fetchone()
+        return War(*row) if row is not None else None
+
+    return db.wars.select_latest_war(conn)
+
+
+async def _fetch_hexes(
+        maps: List[Map]
+) -> Tuple[List[Iterator[Tuple]], List[Iterator[Tuple]]]:
+    """
+    Requests the labels and icons of every given hex at once, over a single
+    aiohttp session whose connector caps how many are actually in flight.
+
+    Args:
+        maps (List[Map]): The hexes to fetch, in the war being synced
+
+    Returns:
+        Tuple[List[Iterator[Tuple]], List[Iterator[Tuple]]]: Each hex's
+        label rows and icon rows, ready to insert, in the same order as maps
+    """
+    async with api.create_session() as session:
+        # Both sets of requests are gathered together, so label
+        # and icon requests run alongside one another
+        labels_per_hex, icons_per_hex = await asyncio.gather(
+            asyncio.gather(*(
+                api.get_labels_for_insert_async(
+                    session, *map_, label_type="Both")
+                for map_ in maps
+            )),
+            asyncio.gather(*(
+                api.get_icons_for_insert_async(session, *map_)
+                for map_ in maps
+            ))
+        )
+
+    return labels_per_hex, icons_per_hex
 
-    # Add each map's labels and icons to the database
-    for map_ in maps:
-        # Add this hex to the 'maps' table
-        db.maps.insert_map(*map_, conn)
-        conn.commit()
-
-        # Get the list of major & minor map labels for this hex map.
-        # These are in the format (map name, war number, label, x, y)
-        labels: List[Label] = [
-            Label(map_.map_name, map_.war_number, *label_tuple[:3])
-            for label_tuple in api.get_labels(
-                map_name=map_.map_name,
-                label_type="Both"
-            )
-        ]
-
-        # Insert the labels
-        for label in labels:
-            db.labels.insert_label(*label, conn)
-        conn.commit()
-
-        # Get the list of icons for this hex map. These are in the 
-        # form of tuples of (x, y, icon type, icon flags bitmask).
-        icons: List[Icon] = [
-            Icon(map_.map_name, map_.war_number, *icon_tuple)
-            for icon_tuple in api.get_icons(
-                map_name=map_.map_name
-            )
-        ]
-
-        # Insert the icons
-        for icon in icons:
-            db.icons.insert_icon(*icon, conn)
-        
-    
 
 __all__ = [
+    "WarUpdate",
     "sync_war",
+    "fetch_war",
+    "fetch_war_async",
+    "write_war",
     "execute_cold_start"
 ]
\ No newline at end of file
@@ -6,12 +6,35 @@ a new war has begun.
 """
 __all__ = [
     "get_war",
+    "get_war_async",
+    "get_war_if_modified",
     "get_maps",
+    "get_maps_async",
+    "get_maps_for_war",
     "get_icons",
-    "get_labels"
+    "get_icons_async",
+    "get_icons_for_insert",
+    "get_icons_for_insert_async",
+    "get_labels",
+    "get_labels_async",
+    "get_labels_for_insert",
+    "get_labels_for_insert_async",
+    "precompute_map_urls",
+    "create_session",
+    "fetch"
 ]
 
-from .get_war import get_war
-from .get_maps import get_maps
-from .get_icons import get_icons
-from .get_labels import get_labels
+from .get_war import get_war, get_war_async, get_war_if_modified
+from .get_maps import get_maps, get_maps_async, get_maps_for_war
+from .get_icons import \
+    get_icons, \
+    get_icons_async, \
+    get_icons_for_insert, \
+    get_icons_for_insert_async
+from .get_labels import \
+    get_labels, \
+    get_labels_async, \
+    get_labels_for_insert, \
+    get_labels_for_insert_async
+from .endpoints import precompute_map_urls
+from .session import create_session, fetch
@@ -0,0 +1,132 @@
+"""
+Contains a small in-process cache of raw War API responses, so that repeat
+requests for the same URL within a short window skip the network entirely.
+"""
+import threading
+import time
+from typing import Dict, Tuple
+
+import aiohttp
+
+from .session import REQUEST_TIMEOUT, fetch, requests_session
+
+# Static map data (labels) doesn't change over the course of a war, while
+# dynamic map data (icons) may change every few minutes.
+STATIC_TTL = 86400
+DYNAMIC_TTL = 30
+
+
+class TTLCache:
+    """
+    A size-bounded mapping of URL to response body, where each entry
+    expires a fixed number of seconds after it was stored. Safe to share
+    between the threads which fetch maps in parallel.
+    """
+    def __init__(self, maxsize: int = 512) -> None:
+        """
+        Args:
+            maxsize (int, optional): The most entries to hold at once.
+            Defaults to 512.
+        """
+        self.maxsize = maxsize
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Returns the value stored for a key, or None if there isn't
+        one or it has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """
+        Stores a value for the given number of seconds, making room
+        first by dropping expired entries and then the oldest ones.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                for stale_key in [
+                    k for k, (expires_at, _) in self._entries.items()
+                    if expires_at <= now
+                ]:
+                    del self._entries[stale_key]
+
+                while len(self._entries) >= self.maxsize:
+                    del self._entries[next(iter(self._entries))]
+
+            self._entries[key] = (now + ttl, value)
+
+    def clear(self) -> None:
+        """Drops every entry in the cache."""
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = TTLCache()
+
+
+def get_cached(url: str, ttl: float) -> bytes:
+    """
+    Returns the body of a GET request to the given URL, reusing the response
+    to an earlier request for the same URL if it's less than ttl seconds old.
+
+    Args:
+        url (str): The full URL to request
+        ttl (float): How many seconds a fresh response may be reused for
+
+    Raises:
+        requests.HTTPError: If the response was unsuccessful, in which case
+        it isn't cached
+
+    Returns:
+        bytes: The raw body of the response
+    """
+    content = _cache.get(url)
+    if content is None:
+        response = requests_session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+
+        content = response.content
+        _cache.set(url, content, ttl)
+
+    return content
+
+
+async def fetch_cached(
+        session: aiohttp.ClientSession,
+        url: str,
+        ttl: float) -> bytes:
+    """
+    Works as get_cached() does, sharing the same cache, but makes any
+    request it needs on the given aiohttp session.
+
+    Args:
+        session (aiohttp.ClientSession): The session made by create_session()
+        url (str): The full URL to request
+        ttl (float): How many seconds a fresh response may be reused for
+
+    Raises:
+        aiohttp.ClientResponseError: If the response was unsuccessful, in
+        which case it isn't cached
+
+    Returns:
+        bytes: The raw body of the response
+    """
+    content = _cache.get(url)
+    if content is None:
+        content = await fetch(session, url)
+        _cache.set(url, content, ttl)
+
+    return content
@@ -0,0 +1,64 @@
+"""
+Contains the fully-assembled War API URLs, along with lookup tables of
+per-map ones, so that the war, map, label, and icon fetchers don't have to
+rebuild the same URL strings from the configured templates on every request.
+"""
+import sys
+import config
+from typing import Dict, Iterable
+
+# The configured API root and endpoint suffixes, read from config only once
+_ROOT = config.war_api_roots.selected
+_ENDPOINTS = config.war_api_endpoints
+
+# Full URLs of the /war and /maps endpoints, which take no parameters
+WAR_URL = _ROOT + _ENDPOINTS.war
+MAPS_URL = _ROOT + _ENDPOINTS.maps
+
+# Full static and dynamic map data URL templates, with only the hex to fill
+_STATIC_TEMPLATE = _ROOT + _ENDPOINTS.static_map_data
+_DYNAMIC_TEMPLATE = _ROOT + _ENDPOINTS.dynamic_map_data
+
+# Full static and dynamic map data URLs, keyed by hex map name
+STATIC_URLS: Dict[str, str] = {}
+DYNAMIC_URLS: Dict[str, str] = {}
+
+
+def precompute_map_urls(map_names: Iterable[str]) -> None:
+    """
+    Builds the static and dynamic map data URLs for each of the given
+    hexes once, storing them for later lookup by map name.
+
+    Args:
+        map_names (Iterable[str]): The hex map names in the current war,
+        as returned by get_maps()
+    """
+    for name in map_names:
+        STATIC_URLS[name] = sys.intern(
+            _STATIC_TEMPLATE.format(map_name=name))
+        DYNAMIC_URLS[name] = sys.intern(
+            _DYNAMIC_TEMPLATE.format(map_name=name))
+
+
+def static_map_url(map_name: str) -> str:
+    """
+    Returns the /maps/:mapName/static URL for a hex, building (and keeping)
+    it on the spot if that hex wasn't among the precomputed ones.
+    """
+    try:
+        return STATIC_URLS[map_name]
+    except KeyError:
+        precompute_map_urls((map_name,))
+        return STATIC_URLS[map_name]
+
+
+def dynamic_map_url(map_name: str) -> str:
+    """
+    Returns the /maps/:mapName/dynamic/public URL for a hex, building (and
+    keeping) it on the spot if that hex wasn't among the precomputed ones.
+    """
+    try:
+        return DYNAMIC_URLS[map_name]
+    except KeyError:
+        precompute_map_urls((map_name,))
+        return DYNAMIC_URLS[map_name]
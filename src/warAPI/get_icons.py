@@ -1,6 +1,13 @@
-import config
-import requests
-from typing import List, Tuple
+import operator
+from typing import Iterator, List, Tuple
+
+import aiohttp
+
+from . import cache, endpoints
+from .schemas import dynamic_map_data_decoder
+
+# Pulls (x, y, icon type, icon flags) off a decoded icon in one C call
+_icon_fields = operator.attrgetter("x", "y", "iconType", "flags")
 
 
 def get_icons(map_name: str) -> List[Tuple[float, float, int, int]]:
@@ -18,16 +25,100 @@ def get_icons(map_name: str) -> List[Tuple[float, float, int, int]]:
         List[Tuple[float, float, int, int]]: 
         A list of tuples of (x, y, icon type, icon flags)
     """
-    # Assemble URL
-    root = config.war_api_roots.selected
-    suffix = config.war_api_endpoints.dynamic_map_data.format(map_name=map_name)
-    url = root + suffix
+    # Look up the precomputed URL for this hex
+    url = endpoints.dynamic_map_url(map_name)
+
+    # Make request and parse the icons out of the result body
+    body = cache.get_cached(url, cache.DYNAMIC_TTL)
+    return _parse_icons(body)
+
+
+async def get_icons_async(
+        session: aiohttp.ClientSession,
+        map_name: str) -> List[Tuple[float, float, int, int]]:
+    """
+    Works as get_icons() does, but makes its request on the given aiohttp
+    session, so that many hexes' icons can be awaited at once.
+
+    Args:
+        session (aiohttp.ClientSession): The session made by create_session()
+        map_name (str): The systematic name of a specific
+        hex on the world map (e.g. 'TheFingersHex')
+
+    Returns:
+        List[Tuple[float, float, int, int]]: 
+        A list of tuples of (x, y, icon type, icon flags)
+    """
+    body = await cache.fetch_cached(
+        session, endpoints.dynamic_map_url(map_name), cache.DYNAMIC_TTL)
+    return _parse_icons(body)
+
+
+def get_icons_for_insert(
+        map_name: str,
+        war_number: int) -> Iterator[Tuple[str, int, float, float, int, int]]:
+    """
+    Fetches a hex's icons as get_icons() does, but as rows ready to be
+    passed straight to db.icons.insert_icons(). Rows are built lazily from
+    the decoded response as they're drawn, so a hex's icons are never held
+    as a second, complete list of tuples.
+
+    Args:
+        map_name (str): The systematic name of a specific
+        hex on the world map (e.g. 'TheFingersHex')
+        war_number (int): The war the icons are being recorded for
+
+    Returns:
+        Iterator[Tuple[str, int, float, float, int, int]]: Tuples of
+        (map name, war number, x, y, icon type, icon flags)
+    """
+    body = cache.get_cached(endpoints.dynamic_map_url(map_name),
+                            cache.DYNAMIC_TTL)
+    return _icon_rows(map_name, war_number, body)
+
+
+async def get_icons_for_insert_async(
+        session: aiohttp.ClientSession,
+        map_name: str,
+        war_number: int) -> Iterator[Tuple[str, int, float, float, int, int]]:
+    """
+    Works as get_icons_for_insert() does, but makes its request on the
+    given aiohttp session, so that many hexes' icons can be awaited at once.
+
+    Args:
+        session (aiohttp.ClientSession): The session made by create_session()
+        map_name (str): The systematic name of a specific
+        hex on the world map (e.g. 'TheFingersHex')
+        war_number (int): The war the icons are being recorded for
+
+    Returns:
+        Iterator[Tuple[str, int, float, float, int, int]]: Tuples of
+        (map name, war number, x, y, icon type, icon flags)
+    """
+    body = await cache.fetch_cached(
+        session, endpoints.dynamic_map_url(map_name), cache.DYNAMIC_TTL)
+    return _icon_rows(map_name, war_number, body)
 
-    # Make request and get .mapItems from the result body
-    results = requests.get(url, timeout=30).json()
-    map_items = results["mapItems"]
 
-    return [
-        (item["x"], item["y"], item["iconType"], item["flags"])
-        for item in map_items
-    ]
\ No newline at end of file
+def _parse_icons(body: bytes) -> List[Tuple[float, float, int, int]]:
+    """
+    Decodes .mapItems from a /maps/:mapName/dynamic/public response body
+    into tuples of (x, y, icon type, icon flags).
+    """
+    map_items = dynamic_map_data_decoder.decode(body).mapItems
+
+    return list(map(_icon_fields, map_items))
+
+
+def _icon_rows(
+        map_name: str,
+        war_number: int,
+        body: bytes) -> Iterator[Tuple[str, int, float, float, int, int]]:
+    """
+    Decodes .mapItems from a /maps/:mapName/dynamic/public response body
+    into lazily-built rows of (map name, war number, x, y, icon type, icon
+    flags), each assembled by C-level calls alone.
+    """
+    map_items = dynamic_map_data_decoder.decode(body).mapItems
+
+    return map((map_name, war_number).__add__, map(_icon_fields, map_items))
\ No newline at end of file
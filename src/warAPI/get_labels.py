@@ -1,6 +1,24 @@
-import config
-import requests
-from typing import List, Tuple
+import operator
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+import aiohttp
+
+from . import cache, endpoints
+from .schemas import MapTextItem, static_map_data_decoder
+
+# The test a label must pass to be kept, for each accepted label_type, built
+# once here rather than worked out on every call. None keeps every label.
+_LABEL_FILTERS: Dict[str, Callable[[MapTextItem], bool] | None] = {
+    "major": lambda item: item.mapMarkerType == "Major",
+    "minor": lambda item: item.mapMarkerType == "Minor",
+    "both": None
+}
+
+# Pulls (label text, x, y, label type) off a decoded label in one C call
+_label_fields = operator.attrgetter("text", "x", "y", "mapMarkerType")
+
+# Pulls (label text, x, y) off a decoded label, as stored in the database
+_label_row_fields = operator.attrgetter("text", "x", "y")
 
 
 def get_labels(
@@ -19,33 +37,139 @@ def get_labels(
         List[Tuple[str, int, int, str]]: A tuple containing
         (label text, x, y, label type)
     """
-    # Assemble URL, including map name parameter
-    root = config.war_api_roots.selected
-    suffix = config.war_api_endpoints.static_map_data.format(map_name=map_name)
-    url = root + suffix
-
-    # Make the request and parse the results to JSON.
-    # Result format is: [("text", "x", "y", "mapMarkerType"), ...]
-    results = requests.get(url, timeout=30).json()
-
-
-    # Filter--if desired--by label type and return the list of tuples
-    if label_type.lower() == "major":
-        return [
-            (item["text"], item["x"], item["y"], item["mapMarkerType"])
-            for item in results["mapTextItems"]
-            if item["mapMarkerType"] == "Major"
-        ]
-    elif label_type.lower() == "minor":
-        return [
-            (item["text"], item["x"], item["y"], item["mapMarkerType"])
-            for item in results["mapTextItems"]
-            if item["mapMarkerType"] == "Minor"
-        ]
-    elif label_type.lower() == "both":
-        return [
-            (item["text"], item["x"], item["y"], item["mapMarkerType"])
-            for item in results["mapTextItems"]
-        ]
-    else:
-        raise ValueError("label_type must be one of \"Major\", \"Minor\", or \"Both\". Got {val}".format(val=label_type))
\ No newline at end of file
+    # Look up the precomputed URL for this hex
+    url = endpoints.static_map_url(map_name)
+
+    # Check the label type before making any request
+    label_filter = _label_filter(label_type)
+
+    # Make the request and parse the labels out of its body
+    body = cache.get_cached(url, cache.STATIC_TTL)
+    return _parse_labels(body, label_filter)
+
+
+async def get_labels_async(
+        session: aiohttp.ClientSession,
+        map_name: str,
+        label_type="Major") -> List[Tuple[str, int, int, str]]:
+    """
+    Works as get_labels() does, but makes its request on the given aiohttp
+    session, so that many hexes' labels can be awaited at once.
+
+    Args:
+        session (aiohttp.ClientSession): The session made by create_session()
+        map_name (str): The hex for which to pull major and minor labels.
+        label_type (str, optional): "Major", "Minor", or "Both". Defaults to "Major".
+
+    Returns:
+        List[Tuple[str, int, int, str]]: A tuple containing
+        (label text, x, y, label type)
+    """
+    label_filter = _label_filter(label_type)
+    body = await cache.fetch_cached(
+        session, endpoints.static_map_url(map_name), cache.STATIC_TTL)
+    return _parse_labels(body, label_filter)
+
+
+def get_labels_for_insert(
+        map_name: str,
+        war_number: int,
+        label_type="Both") -> Iterator[Tuple[str, int, str, float, float]]:
+    """
+    Fetches a hex's labels as get_labels() does, but as rows ready to be
+    passed straight to db.labels.insert_labels(), which can then draw them
+    from the returned iterator without any intermediate list being built.
+
+    Args:
+        map_name (str): The hex for which to pull major and minor labels.
+        war_number (int): The war the labels are being recorded for.
+        label_type (str, optional): "Major", "Minor", or "Both". Defaults to "Both".
+
+    Returns:
+        Iterator[Tuple[str, int, str, float, float]]: Tuples of
+        (map name, war number, label text, x, y)
+    """
+    url = endpoints.static_map_url(map_name)
+    label_filter = _label_filter(label_type)
+
+    body = cache.get_cached(url, cache.STATIC_TTL)
+    return _label_rows(map_name, war_number, body, label_filter)
+
+
+async def get_labels_for_insert_async(
+        session: aiohttp.ClientSession,
+        map_name: str,
+        war_number: int,
+        label_type="Both") -> Iterator[Tuple[str, int, str, float, float]]:
+    """
+    Works as get_labels_for_insert() does, but makes its request on the
+    given aiohttp session, so that many hexes' labels can be awaited at once.
+
+    Args:
+        session (aiohttp.ClientSession): The session made by create_session()
+        map_name (str): The hex for which to pull major and minor labels.
+        war_number (int): The war the labels are being recorded for.
+        label_type (str, optional): "Major", "Minor", or "Both". Defaults to "Both".
+
+    Returns:
+        Iterator[Tuple[str, int, str, float, float]]: Tuples of
+        (map name, war number, label text, x, y)
+    """
+    label_filter = _label_filter(label_type)
+    body = await cache.fetch_cached(
+        session, endpoints.static_map_url(map_name), cache.STATIC_TTL)
+    return _label_rows(map_name, war_number, body, label_filter)
+
+
+def _label_filter(label_type: str) -> Callable[[MapTextItem], bool] | None:
+    """
+    Returns the test a label must pass to be kept for a label_type, or None
+    to keep every label, raising a ValueError if the label_type isn't valid.
+    """
+    try:
+        return _LABEL_FILTERS[label_type.lower()]
+    except KeyError:
+        raise ValueError("label_type must be one of \"Major\", \"Minor\", or \"Both\". Got {val}".format(val=label_type)) from None
+
+
+def _decode_labels(
+        body: bytes,
+        label_filter: Callable[[MapTextItem], bool] | None
+) -> Iterable[MapTextItem]:
+    """
+    Decodes the labels out of a /maps/:mapName/static response body,
+    keeping only those which pass the given filter (or all, if None).
+    """
+    items = static_map_data_decoder.decode(body).mapTextItems
+    if label_filter is None:
+        return items
+
+    return filter(label_filter, items)
+
+
+def _parse_labels(
+        body: bytes,
+        label_filter: Callable[[MapTextItem], bool] | None
+) -> List[Tuple[str, int, int, str]]:
+    """
+    Decodes a /maps/:mapName/static response body into label tuples of
+    (label text, x, y, label type), keeping only those passing the filter.
+    """
+    return list(map(_label_fields, _decode_labels(body, label_filter)))
+
+
+def _label_rows(
+        map_name: str,
+        war_number: int,
+        body: bytes,
+        label_filter: Callable[[MapTextItem], bool] | None
+) -> Iterator[Tuple[str, int, str, float, float]]:
+    """
+    Decodes a /maps/:mapName/static response body into lazily-built label
+    rows of (map name, war number, label text, x, y), keeping only those
+    passing the filter. Each row is assembled by C-level calls alone: a
+    getter for the label's fields, then a tuple concatenation prepending
+    the hex's (map name, war number) key.
+    """
+    items = _decode_labels(body, label_filter)
+    return map((map_name, war_number).__add__, map(_label_row_fields, items))
@@ -1,6 +1,9 @@
-import config
-import requests
-from typing import List
+import functools
+import aiohttp
+from .endpoints import MAPS_URL
+from .schemas import map_names_decoder
+from .session import fetch, REQUEST_TIMEOUT, requests_session
+from typing import List, Tuple
 
 
 def get_maps() -> List[str]:
@@ -11,13 +14,40 @@ def get_maps() -> List[str]:
     Returns:
         List[str]: A list of unique hex map names in the current war
     """
-    # Assemble the URL for the /maps endpoint
-    root = config.war_api_roots.selected
-    suffix = config.war_api_endpoints.maps
-    url = root + suffix
-
     # Make request to the /maps endpoint
-    response = requests.get(url, timeout=30)
+    response = requests_session.get(MAPS_URL, timeout=REQUEST_TIMEOUT)
+
+    # Decode and return the content
+    return map_names_decoder.decode(response.content)
+
+
+async def get_maps_async(session: aiohttp.ClientSession) -> List[str]:
+    """
+    Works as get_maps() does, but makes its request on the given aiohttp
+    session, so that it can be awaited alongside other War API requests.
+
+    Args:
+        session (aiohttp.ClientSession): The session made by create_session()
+
+    Returns:
+        List[str]: A list of unique hex map names in the current war
+    """
+    return map_names_decoder.decode(await fetch(session, MAPS_URL))
+
+
+@functools.lru_cache(maxsize=4)
+def get_maps_for_war(war_number: int) -> Tuple[str, ...]:
+    """
+    Returns the hex map names in the given war, as get_maps() does, but
+    only makes the request the first time it's asked about each war. A
+    war's hexes don't change over its course, so this is safe to use
+    wherever the current war number is already known.
+
+    Args:
+        war_number (int): The current war's number, as from get_war()
 
-    # Deserialize and return the content
-    return response.json()
\ No newline at end of file
+    Returns:
+        Tuple[str, ...]: The unique hex map names in that war
+    """
+    # Frozen as a tuple, since every caller shares the cached result
+    return tuple(get_maps())
@@ -1,30 +1,79 @@
-#from ... import config
-import config
-import requests
+from .endpoints import WAR_URL
+from .session import fetch, REQUEST_TIMEOUT, requests_session
+from .schemas import war_data_decoder
+import aiohttp
 import datetime
 from typing import Tuple
 
+_UTC = datetime.timezone.utc
+
 
 def get_war() -> Tuple[int, datetime.datetime]:
     """
     Fetches the latest war on the server specified in the configs.
+    Returns:
+        Tuple[int, datetime.datetime]: A tuple of (war number, date fetched),
+        the latter as an aware datetime in UTC
+    """
+    # Make the GET request to the /war endpoint and fetch the result
+    response = requests_session.get(WAR_URL, timeout=REQUEST_TIMEOUT)
+
+    # Make a note of the time the request was completed. Taking it in UTC
+    # skips resolving the local timezone, and the database stores aware
+    # datetimes in UTC in any case.
+    pulled_on = datetime.datetime.now(_UTC)
+
+    # Decode the content, which should have a 'warNumber' attribute
+    war_num = war_data_decoder.decode(response.content).warNumber
+
+    # Return the war number and the time of the request
+    return war_num, pulled_on
+
+
+async def get_war_async(
+        session: aiohttp.ClientSession
+) -> Tuple[int, datetime.datetime]:
+    """
+    Works as get_war() does, but makes its request on the given aiohttp
+    session, so that it can be awaited alongside other War API requests.
+
+    Args:
+        session (aiohttp.ClientSession): The session made by create_session()
+
     Returns:
         Tuple[int, datetime.datetime]: A tuple of (war number, date fetched)
     """
-    # Piece together the URL for the /war endpoint
-    root = config.war_api_roots.selected
-    suffix = config.war_api_endpoints.war
-    url = root + suffix
+    body = await fetch(session, WAR_URL)
+    pulled_on = datetime.datetime.now(_UTC)
 
-    # Make the GET request and fetch the result
-    response = requests.get(url, timeout=30)
+    return war_data_decoder.decode(body).warNumber, pulled_on
 
-    # Make a note of the time the request was completed
-    pulled_on = datetime.datetime.now()
 
-    # Deserialize the content, which should have a 'warNumber' attribute
-    res_body = response.json()
-    war_num = res_body["warNumber"]
+def get_war_if_modified(
+        etag: str | None
+) -> Tuple[int, datetime.datetime, str | None] | None:
+    """
+    Fetches the latest war as get_war() does, but as a conditional request
+    which the API can answer with an empty 304 Not Modified if its /war
+    response still matches the given ETag.
 
-    # Return the war number and the time of the request
-    return war_num, pulled_on
\ No newline at end of file
+    Args:
+        etag (str | None): The ETag of an earlier /war response, if any
+
+    Returns:
+        Tuple[int, datetime.datetime, str | None] | None: A tuple of (war
+        number, date fetched, new ETag), or None if nothing has changed
+    """
+    # Only ask the API to compare ETags if we have one to compare
+    headers = {"If-None-Match": etag} if etag else None
+    response = requests_session.get(
+        WAR_URL, headers=headers, timeout=REQUEST_TIMEOUT)
+
+    # If the response is unchanged, the server won't have sent a body
+    if response.status_code == 304:
+        return None
+
+    pulled_on = datetime.datetime.now(_UTC)
+    war_num = war_data_decoder.decode(response.content).warNumber
+
+    return war_num, pulled_on, response.headers.get("ETag")
\ No newline at end of file
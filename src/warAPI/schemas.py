@@ -0,0 +1,50 @@
+"""
+Contains typed msgspec schemas for the parts of War API responses that
+the application reads, along with a reusable decoder for each. Decoding
+straight into these structs skips building a throwaway dict per item,
+and fields not listed here are skipped over rather than parsed.
+
+The per-item structs hold nothing but scalars, so they can never be part
+of a reference cycle, and are declared gc=False to keep the thousands
+decoded per war sync out of the garbage collector's tracking entirely.
+"""
+import msgspec
+from typing import List
+
+
+class WarData(msgspec.Struct):
+    """The body of a /war response."""
+    warNumber: int
+
+
+class MapItem(msgspec.Struct, gc=False):
+    """A single icon in a hex's dynamic map data."""
+    x: float
+    y: float
+    iconType: int
+    flags: int
+
+
+class DynamicMapData(msgspec.Struct):
+    """The body of a /maps/:mapName/dynamic/public response."""
+    mapItems: List[MapItem] = []
+
+
+class MapTextItem(msgspec.Struct, gc=False):
+    """A single major or minor label in a hex's static map data."""
+    text: str
+    x: float
+    y: float
+    mapMarkerType: str
+
+
+class StaticMapData(msgspec.Struct):
+    """The body of a /maps/:mapName/static response."""
+    mapTextItems: List[MapTextItem] = []
+
+
+# Decoders are built once here and shared by every call
+war_data_decoder = msgspec.json.Decoder(WarData)
+map_names_decoder = msgspec.json.Decoder(List[str])
+dynamic_map_data_decoder = msgspec.json.Decoder(DynamicMapData)
+static_map_data_decoder = msgspec.json.Decoder(StaticMapData)
@@ -0,0 +1,81 @@
+"""
+Contains helpers for the single aiohttp session the bot keeps open to
+the War API, so that async requests reuse pooled keep-alive connections
+instead of repeating DNS lookups and TLS handshakes on every call, along
+with a requests session which does the same for the blocking fetchers.
+"""
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connection pool settings for the shared session
+CONNECTION_LIMIT = 32
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+# How long a request may take to connect, and then to send each chunk of its
+# response, in seconds. Kept separate so that an unreachable server is given
+# up on quickly, without cutting short a slow but live response.
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+
+# The same limits, in the form requests takes them
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+def create_session() -> aiohttp.ClientSession:
+    """
+    Creates the application's shared War API session. Must be called from
+    within a running event loop, and the session closed when it's done.
+
+    Returns:
+        aiohttp.ClientSession: A session with a pooled keep-alive connector
+    """
+    connector = aiohttp.TCPConnector(
+        limit=CONNECTION_LIMIT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT
+    )
+    timeout = aiohttp.ClientTimeout(
+        sock_connect=CONNECT_TIMEOUT,
+        sock_read=READ_TIMEOUT
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+def create_requests_session() -> requests.Session:
+    """
+    Creates a blocking War API session whose connection pool is large
+    enough for CONNECTION_LIMIT threads to make requests at once.
+
+    Returns:
+        requests.Session: A session with a pooled keep-alive adapter
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=CONNECTION_LIMIT,
+        pool_maxsize=CONNECTION_LIMIT
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared by get_war(), get_maps(), and the response cache
+requests_session = create_requests_session()
+
+
+async def fetch(session: aiohttp.ClientSession, url: str) -> bytes:
+    """
+    Makes a GET request on the shared session, returning the raw body.
+
+    Args:
+        session (aiohttp.ClientSession): The session made by create_session()
+        url (str): The full URL to request
+
+    Returns:
+        bytes: The raw body of the response
+    """
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.read()
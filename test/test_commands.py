@@ -0,0 +1,40 @@
+import pytest
+
+from src import commands
+from src.commands import UserCommand, UnsupportedVerbException
+
+class TestUserCommand:
+    """Contains methods for testing the commands.UserCommand class"""
+    def test_parses_username_from_bang_command(self):
+        """Reads the target username from a full !user command"""
+        command = UserCommand("!user @chillCherry role give moderator")
+
+        assert command.username == "@chillCherry"
+        assert command.command == "user"
+
+    def test_raises_exception_on_unsupported_verb(self):
+        """Raises an UnsupportedVerbException for verbs it doesn't know"""
+        with pytest.raises(UnsupportedVerbException):
+            UserCommand("!user @chillCherry promote")
+
+    def test_execute_replies_that_command_is_unsupported(self):
+        """Answers with a reply rather than raising, until verbs are built"""
+        command = UserCommand("!user @chillCherry role give moderator")
+
+        assert "isn't supported yet" in command.execute()
+
+    def test_is_only_defined_once(self):
+        """Is the same class wherever it's imported from in src.commands"""
+        from src.commands.user import UserCommand as user_module_command
+
+        assert commands.UserCommand is user_module_command
+
+class TestHandlers:
+    """Contains methods for testing the commands.HANDLERS dispatch table"""
+    def test_routes_user_keyword_to_user_command(self):
+        """Looks up UserCommand by its 'user' keyword"""
+        assert commands.HANDLERS["user"] is UserCommand
+
+    def test_has_no_handler_for_unknown_keyword(self):
+        """Returns nothing for keywords no Command is registered under"""
+        assert commands.HANDLERS.get("notacommand") is None
@@ -1,5 +1,8 @@
+import functools
+import os
 import pytest
 import sqlite3
+from typing import List
 
 import src.db as data
 from test.test_database.test_data import \
@@ -24,8 +27,6 @@ drop_it_all_sql = \
     );
 
     PRAGMA writable_schema = 0;
-    
-    VACUUM;
     """
 
 @pytest.fixture(
@@ -35,9 +36,74 @@ drop_it_all_sql = \
 def foo():
     yield "bar"
 
-# Setup behavior for each test is to open a new connection to an in-memory DB.
-# The proper pattern for pytest fixtures is that setup logic should happen
-# before a yield command, after which teardown logic is executed.
+# Empties a single table. Table names can't be bound as parameters, but
+# these only ever come from the test database's own sqlite_master.
+_clear_table_sql = "DELETE FROM {table}"
+
+# Selects the name of every table in the schema which holds test data,
+# along with AUTOINCREMENT's counters so ticket numbers start over too
+_select_tables_sql = """
+    SELECT name
+    FROM sqlite_master
+    WHERE
+        type = 'table'
+        AND (name NOT LIKE 'sqlite_%' OR name = 'sqlite_sequence')
+"""
+
+
+# The test database is thrown away after every session, so its connections
+# skip syncing to disk altogether. The rest of the production tuning is kept,
+# WAL included, since the pooled readers and writer share the database just
+# as they do in production; an exclusive lock or a non-WAL journal would
+# have them block one another.
+_TEST_CONNECTION_PRAGMAS = data.db.CONNECTION_PRAGMAS + """
+    PRAGMA synchronous = OFF;
+"""
+
+
+# An in-memory database only lasts as long as some connection to it is
+# open, so one is kept here for the rest of the session once it's created
+_keeper_connections: List[sqlite3.Connection] = []
+
+
+@functools.cache
+def _test_database() -> data.DB:
+    """
+    Creates the test database and its schema, only once per test session.
+    A file database is started afresh, so no schema from an earlier run
+    lingers, while an in-memory one is kept open for the whole session.
+    """
+    if not TEST_DB_CONN_STRING.startswith("file:"):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(TEST_DB_CONN_STRING + suffix)
+            except FileNotFoundError:
+                pass
+
+    db = data.DB(TEST_DB_CONN_STRING, pragmas=_TEST_CONNECTION_PRAGMAS)
+    _keeper_connections.append(db.get_connection())
+    db.generate_db()
+    return db
+
+
+def _clear_tables(db: data.DB) -> None:
+    """
+    Deletes every row from every table in the given database in a single
+    transaction, leaving the schema itself in place for the next test.
+    """
+    with db.writer() as conn:
+        tables = [name for (name,) in conn.execute(_select_tables_sql)]
+        for table in tables:
+            conn.execute(_clear_table_sql.format(table=table))
+
+
+# The schema is only created once per session, while each test starts from
+# empty tables. Fixtures write through the DB's pooled writer connection,
+# so the whole session reuses one connection for setup and teardown rather
+# than opening a new one each time.
+#
+# The proper pattern for pytest fixtures is that setup logic
+# should happen before a yield command, after which teardown logic runs.
 @pytest.fixture(
     scope="function", # DB teardown should happen after the end of each test
     name="database_fixture"
@@ -47,19 +113,14 @@ def database_fixture():
     Fixture which prepares a configured instance of the DB class, to be
     used in the preparation of later-stage fixtures in this module.
     """
-    # Create fresh test DB environment
-    db = data.DB(TEST_DB_CONN_STRING)
-    db.generate_db()
+    # Use the session's test DB, creating it on first use
+    db = _test_database()
 
     # Yield until after test execution
     yield db
 
-    # After the test, reset the DB state by dropping everything and
-    # hoping that the .db file isn't corrupted by this silly command
-    
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.executescript(drop_it_all_sql)
+    # After the test, reset the DB state by emptying every table
+    _clear_tables(db)
 
 
 @pytest.fixture(
@@ -74,16 +135,9 @@ def valid_war_fixture(database_fixture):
         db_fixture (db_fixture): An active instance of the fixture
         which prepares and tears down the database file and its schema.
     """
-    conn = database_fixture.get_connection()
-    # war_num, pulled_on = VALID_WAR
-    # data.wars.insert_war(
-    #     war_number=war_num,
-    #     last_fetched_on=pulled_on,
-    #     conn=conn
-    # )
-    data.wars.insert_war(*VALID_WAR, conn)
-
-    conn.commit()
+    # Insert the war on the pooled writer, which commits as the block exits
+    with database_fixture.writer() as conn:
+        data.wars.insert_war(VALID_WAR.war_number, VALID_WAR.pulled_on, conn)
 
     yield database_fixture
 
@@ -102,15 +156,10 @@ def valid_maps_fixture(valid_war_fixture) -> data.DB:
     Yields:
         data.DB: The configured DB object passed to this fixture
     """
-    # Get a connection to the specified test DB
-    conn: sqlite3.Connection = valid_war_fixture.get_connection()
-
-    # Insert each of this class's known test maps
-    for hex_name, war_num in VALID_MAPS:
-        data.maps.insert_map(hex_name, war_num, conn)
-
-    # Commit the result
-    conn.commit()
+    # Insert all of this class's known test maps in a single transaction,
+    # committed as the pooled writer's block exits
+    with valid_war_fixture.writer() as conn:
+        data.maps.insert_maps(VALID_MAPS, conn)
 
     # Yield the active DB instance we were first given
     yield valid_war_fixture
@@ -120,13 +169,9 @@ def valid_maps_fixture(valid_war_fixture) -> data.DB:
     name="valid_icons_fixture"
 )
 def valid_icons_fixture(valid_maps_fixture):
-    # Get a connection to the specified test DB
-    conn = valid_maps_fixture.get_connection()
-
-    # Insert each of the test icons
-    for icon in VALID_ICONS:
-        data.icons.insert_icon(*icon, conn)
-        conn.commit()
+    # Insert all of the test icons at once
+    with valid_maps_fixture.writer() as conn:
+        data.icons.insert_icons(VALID_ICONS, conn)
 
     # Yield the original fixture
     yield valid_maps_fixture
@@ -136,13 +181,9 @@ def valid_icons_fixture(valid_maps_fixture):
     name="valid_labels_fixture"
 )
 def valid_labels_fixture(valid_maps_fixture):
-    # Get a connection to the specified DB from the parent fixture
-    conn = valid_maps_fixture.get_connection()
-
-    # Insert each of the valid test labels
-    for label in VALID_LABELS:
-        data.labels.insert_label(*label, conn)
-        conn.commit()
+    # Insert all of the valid test labels at once
+    with valid_maps_fixture.writer() as conn:
+        data.labels.insert_labels(VALID_LABELS, conn)
 
     # Yield the original fixture
     yield valid_maps_fixture
\ No newline at end of file
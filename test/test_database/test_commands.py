@@ -1,3 +1,113 @@
+import asyncio
+import datetime
+import pytest
+
 from src import db
+from src.db import CommandData, CommandWriter
 from test_data import TEST_DB_CONN_STRING
-from fixtures import database_fixture
\ No newline at end of file
+from fixtures import database_fixture
+
+VALID_COMMANDS = [
+    CommandData(
+        id=1000 + i,
+        command="!ticket",
+        user=42,
+        guild="Test Guild",
+        channel="logistics",
+        created_at=datetime.datetime(2024, 1, 1, 12, 0, i),
+        content=f"!ticket create {i}"
+    )
+    for i in range(3)
+]
+
+def _count_commands(conn) -> int:
+    return conn.execute("SELECT COUNT(*) FROM commands").fetchone()[0]
+
+def test_inserts_many_commands(database_fixture):
+    """Inserts every row passed to insert_commands."""
+    conn = database_fixture.get_connection()
+    db.commands.insert_commands(VALID_COMMANDS, conn)
+    conn.commit()
+
+    assert _count_commands(conn) == len(VALID_COMMANDS)
+    conn.close()
+
+def test_command_writer_writes_queue_on_close(database_fixture):
+    """Writes every recorded command by the time CommandWriter.close returns."""
+    async def record_and_close():
+        writer = CommandWriter(database_fixture, flush_interval=60)
+        writer.start()
+        for command in VALID_COMMANDS:
+            writer.record(command)
+        await writer.close()
+
+    asyncio.run(record_and_close())
+    database_fixture.get_pool().close()
+
+    conn = database_fixture.get_connection()
+    assert _count_commands(conn) == len(VALID_COMMANDS)
+    conn.close()
+
+def test_selects_inserted_command(database_fixture):
+    """Returns a command as it was inserted, when selected by its ID."""
+    conn = database_fixture.get_connection()
+    db.commands.insert_command(VALID_COMMANDS[0], conn)
+    conn.commit()
+
+    assert db.commands.select_command(VALID_COMMANDS[0].id, conn) \
+        == VALID_COMMANDS[0]
+    conn.close()
+
+def test_raises_exception_for_unknown_command(database_fixture):
+    """Raises UniqueRowNotFoundException when no command has the given ID."""
+    conn = database_fixture.get_connection()
+    with pytest.raises(db.UniqueRowNotFoundException):
+        db.commands.select_command(VALID_COMMANDS[0].id, conn)
+    conn.close()
+
+def test_command_writer_keeps_good_rows_of_failed_batch(database_fixture):
+    """
+    Writes every other command in a batch when one repeats a message ID,
+    rather than dropping the whole batch.
+    """
+    async def record_and_close():
+        writer = CommandWriter(database_fixture, flush_interval=60)
+        writer.start()
+        for command in (*VALID_COMMANDS, VALID_COMMANDS[0]):
+            writer.record(command)
+        await writer.close()
+
+    asyncio.run(record_and_close())
+    database_fixture.get_pool().close()
+
+    conn = database_fixture.get_connection()
+    assert _count_commands(conn) == len(VALID_COMMANDS)
+    conn.close()
+
+def test_command_writer_survives_malformed_row(database_fixture):
+    """Keeps writing later commands after a row which can't be written."""
+    async def record_and_close():
+        writer = CommandWriter(database_fixture, flush_interval=0)
+        writer.start()
+        writer.record(object())
+        await asyncio.sleep(0.1)
+        for command in VALID_COMMANDS:
+            writer.record(command)
+        await writer.close()
+
+    asyncio.run(record_and_close())
+    database_fixture.get_pool().close()
+
+    conn = database_fixture.get_connection()
+    assert _count_commands(conn) == len(VALID_COMMANDS)
+    conn.close()
+
+def test_command_writer_drops_commands_when_queue_full(database_fixture):
+    """Drops commands recorded while the queue is full, instead of raising."""
+    async def record_without_starting():
+        writer = CommandWriter(database_fixture, max_queue=2)
+        for command in VALID_COMMANDS:
+            writer.record(command)
+        return writer.queue.qsize()
+
+    assert asyncio.run(record_without_starting()) == 2
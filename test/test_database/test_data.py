@@ -1,42 +1,52 @@
 import datetime
+import os
 
-from typing import List, Tuple
+from typing import Tuple
 from src.db import War, Map, Icon, Label, CommandData, User
 from src.db.users import Role
 
-# Default DB test environment is a an in-memory DB spun up before each test,
-# but this can be replaced with another environment in the future if needed.
-TEST_DB_CONN_STRING = "test_storage.db"
+# Default DB test environment is an in-memory DB, shared between every
+# connection the tests open, so that no test has to touch the disk. Set
+# PFLTK_TEST_DB to a file path to run the tests against a file instead.
+TEST_DB_CONN_STRING = os.environ.get(
+    "PFLTK_TEST_DB",
+    "file::memory:?cache=shared"
+)
 
-# Our valid hypothetical war is #10 and started yesterday
-VALID_WAR = War(10, datetime.datetime.now() - datetime.timedelta(days=1))
+# Our valid hypothetical war is #10. Its start is a fixed moment rather than
+# one relative to now, since this module is imported under more than one
+# name (by the tests, and by the fixtures as test.test_database.test_data),
+# and every copy must agree on exactly the same war.
+VALID_WAR = War(10, datetime.datetime(2024, 1, 1, 12, 0, 0))
 
-# A pretend list of maps to use in fixtures for other classes' tests
-VALID_MAPS: List[Tuple[str, int]] = [
+# A pretend list of maps to use in fixtures for other classes' tests. These
+# and the rows below are built once, as immutable tuples, when this module
+# is first imported, and so can be shared by every test without copying.
+VALID_MAPS: Tuple[Map, ...] = (
     Map("FoobarHex", VALID_WAR[0]),
     Map("BarbazHex", VALID_WAR[0]),
     Map("BazbotHex", VALID_WAR[0])
-]
+)
 
 # Map name, war number, x, y, icon type, flags
-VALID_ICONS: List[Tuple[str, int, float, float, int, int]] = [
+VALID_ICONS: Tuple[Icon, ...] = (
     Icon(VALID_MAPS[0][0], VALID_MAPS[0][1], 0.25, 0.3, 25, 0),
     Icon(VALID_MAPS[0][0], VALID_MAPS[0][1], 0.35, 0.02, 25, 0),
     Icon(VALID_MAPS[1][0], VALID_MAPS[1][1], 0.275, 0.9, 25, 0),
     Icon(VALID_MAPS[1][0], VALID_MAPS[1][1], 0.1283, 0.949, 25, 0),
     Icon(VALID_MAPS[2][0], VALID_MAPS[2][1], 0.0120, 0.1412, 25, 0),
     Icon(VALID_MAPS[2][0], VALID_MAPS[2][1], 0.58, 0.445, 25, 0)
-]
+)
 
 # Map name, war number, label text, x, y
-VALID_LABELS: List[Tuple[str, int, str, float, float]] = [
+VALID_LABELS: Tuple[Label, ...] = (
     Label(VALID_MAPS[0][0], VALID_MAPS[0][1], "Thing A", 0.24, 0.93),
     Label(VALID_MAPS[0][0], VALID_MAPS[0][1], "Thing B", 0.95, 0.43),
     Label(VALID_MAPS[1][0], VALID_MAPS[1][1], "Stuff A", 0.19, 0.40),
     Label(VALID_MAPS[1][0], VALID_MAPS[1][1], "Stuff B", 0.85, 0.65),
     Label(VALID_MAPS[2][0], VALID_MAPS[2][1], "Junk A", 0.24, 0.398),
     Label(VALID_MAPS[2][0], VALID_MAPS[2][1], "Junk B", 0.94, 0.211)
-]
+)
 
 TEST_GUILD_NAME = "test_guild"
 
@@ -0,0 +1,99 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from src import db as data
+from fixtures import database_fixture
+
+@pytest.fixture(name="file_database")
+def file_database(tmp_path):
+    """
+    A database generated in a real file, for the tuning which only applies
+    to one, since the other tests' database is kept in memory.
+    """
+    database = data.DB(str(tmp_path / "tuning.db"))
+    database.generate_db()
+    yield database
+
+def test_database_file_uses_wal(file_database):
+    """The generated database file is switched over to WAL journaling."""
+    conn = file_database.get_connection()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_connections_are_tuned_for_writes(file_database):
+    """
+    Every new connection relaxes syncing to NORMAL and keeps its page
+    cache, temporary tables, and memory map at the configured sizes.
+    """
+    conn = file_database.get_connection()
+
+    # synchronous=NORMAL and temp_store=MEMORY read back as 1 and 2
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+    assert conn.execute("PRAGMA mmap_size").fetchone()[0] > 0
+    assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 1000
+
+def test_maps_are_indexed_by_war(database_fixture):
+    """Looking up a war's maps is served by an index rather than a scan."""
+    conn = database_fixture.get_connection()
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT map_name FROM maps WHERE war_number = 1"
+    ).fetchall()
+    assert any("idx_maps_war_map" in row[-1] for row in plan)
+
+def test_connection_pragmas_can_be_overridden(tmp_path):
+    """A DB given its own PRAGMA script tunes its connections with it."""
+    database = data.DB(
+        str(tmp_path / "scratch.db"),
+        pragmas="PRAGMA synchronous = OFF;"
+    )
+    conn = database.get_connection()
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+
+def test_generating_from_conn_keeps_its_pragmas(tmp_path):
+    """
+    Generating the schema on a DB's pooled writer leaves that connection
+    tuned with the DB's own pragmas, rather than the defaults.
+    """
+    database = data.DB(
+        str(tmp_path / "overridden.db"),
+        pragmas="PRAGMA synchronous = OFF;"
+    )
+    with database.writer() as conn:
+        database.generate_db_from_conn(conn, commit=False)
+
+    with database.writer() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+
+    database.get_pool().close()
+
+def test_generating_adds_etag_to_older_wars_table(tmp_path):
+    """
+    Generating over a database made before the 'wars' table had an etag
+    column adds the column, keeping the wars already on record.
+    """
+    path = str(tmp_path / "older.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE wars (
+            war_number INTEGER PRIMARY KEY NOT NULL,
+            last_fetched_on TIMESTAMP NOT NULL
+        )
+    """)
+    conn.execute("INSERT INTO wars VALUES (9, 0)")
+    conn.commit()
+    conn.close()
+
+    database = data.DB(path)
+    database.generate_db()
+
+    conn = database.get_connection()
+    assert data.wars.select_latest_war(conn) == data.War(
+        9, datetime.datetime(1970, 1, 1), None)
+
+    data.wars.insert_war(10, datetime.datetime(2024, 1, 1), conn, etag="e")
+    conn.commit()
+    assert data.wars.select_latest_war(conn).etag == "e"
+    conn.close()
@@ -44,6 +44,10 @@ class TestIcons:
             with pytest.raises(Exception):
                 data.icons.insert_icon(*icon, conn)
 
+            # Release the failed insert's write lock before teardown
+            conn.rollback()
+            conn.close()
+
         def test_raises_exception_when_war_does_not_exist(self, valid_icons_fixture):
             # Get a connection
             conn = valid_icons_fixture.get_connection()
@@ -71,6 +75,32 @@ class TestIcons:
             with pytest.raises(Exception):
                 data.icons.insert_icon(icon, conn)
 
+    class TestInsertIcons:
+        def test_inserts_many_valid_icons(self, valid_maps_fixture):
+            """Tests that it inserts every icon it's given in one call."""
+            conn = valid_maps_fixture.get_connection()
+
+            data.icons.insert_icons(VALID_ICONS, conn)
+            conn.commit()
+
+            # Assert that each of the first map's icons can be fetched
+            map_name = VALID_ICONS[0].map_name
+            icons = data.icons.get_latest_icons_for_map(map_name, conn)
+            for icon in VALID_ICONS:
+                if icon.map_name == map_name:
+                    assert icon in icons
+
+        def test_raises_exception_for_repeat_row(self, valid_icons_fixture):
+            """Tests that it raises when a batch contains an existing row"""
+            conn = valid_icons_fixture.get_connection()
+
+            with pytest.raises(Exception):
+                data.icons.insert_icons(VALID_ICONS[:1], conn)
+
+            # Release the failed batch's write lock before teardown
+            conn.rollback()
+            conn.close()
+
 
     class TestGetIconsForMap:
         def test_gets_icons_when_only_one_maps_icons_exist(self, valid_maps_fixture):
@@ -110,6 +140,26 @@ class TestIcons:
             assert VALID_ICONS[4][0] not in result_map_names
         
 
+        def test_streams_icons_across_fetch_chunks(
+                self, valid_maps_fixture, monkeypatch):
+            # Shrink the chunk size so that three icons span several fetches
+            monkeypatch.setattr(data.icons, "ICON_FETCH_SIZE", 2)
+            conn = valid_maps_fixture.get_connection()
+
+            # Insert three icons for the same map
+            map_name, war_number = VALID_ICONS[0][0], VALID_ICONS[0][1]
+            rows = [
+                Icon(map_name, war_number, 0.1 * i, 0.1 * i, 5, 0)
+                for i in range(1, 4)
+            ]
+            data.icons.insert_icons(rows, conn)
+            conn.commit()
+
+            # Stream them back and make sure none were dropped at the seams
+            icons = list(data.icons.iter_latest_icons_for_map(map_name, conn))
+            assert sorted(icons) == sorted(rows)
+
+
         def test_gets_icons_when_map_exists_in_past_war(self, valid_war_fixture):
             # Get a connection
             conn = valid_war_fixture.get_connection()
@@ -119,7 +169,7 @@ class TestIcons:
                 war_number=VALID_WAR.war_number + 1,
                 pulled_on=VALID_WAR.pulled_on + datetime.timedelta(days=30)
             )
-            data.wars.insert_war(*new_war, conn)
+            data.wars.insert_war(new_war.war_number, new_war.pulled_on, conn)
             conn.commit()
 
             # Add one of the test maps for the new war
@@ -181,7 +231,7 @@ class TestIcons:
                 pulled_on=VALID_WAR.pulled_on + datetime.timedelta(days=35)
             )
             # Insert a new war, but not its first map
-            data.wars.insert_war(*new_war, conn)
+            data.wars.insert_war(new_war.war_number, new_war.pulled_on, conn)
             conn.commit()
 
             data.maps.insert_map(
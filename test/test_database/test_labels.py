@@ -57,6 +57,10 @@ class TestLabels:
                     conn
                 )
 
+            # Release the failed insert's write lock before teardown
+            conn.rollback()
+            conn.close()
+
         def test_raises_exception_when_war_does_not_exist(
                 self,
                 valid_labels_fixture
@@ -71,6 +75,35 @@ class TestLabels:
             with pytest.raises(Exception):
                 data.labels.insert_label(map_name, fake_war_number, label, x, y)
 
+    class TestInsertLabels:
+        """Contains tests for the labels.insert_labels() method"""
+        def test_inserts_many_valid_labels(self, valid_maps_fixture):
+            # Get a connection to the test DB
+            conn = valid_maps_fixture.get_connection()
+
+            # Insert every valid label in a single call and commit
+            data.labels.insert_labels(VALID_LABELS, conn)
+            conn.commit()
+
+            # See that the first map's labels were all inserted
+            map_name = VALID_LABELS[0].map_name
+            rows = data.labels.select_latest_labels_for_map(map_name, conn)
+            for label in VALID_LABELS:
+                if label.map_name == map_name:
+                    assert label in rows
+
+        def test_raises_exception_for_repeat_row(self, valid_labels_fixture):
+            # Get a connection to a DB with the VALID_LABELS already in it
+            conn = valid_labels_fixture.get_connection()
+
+            # Assert that inserting one of them again raises an exception
+            with pytest.raises(Exception):
+                data.labels.insert_labels(VALID_LABELS[:1], conn)
+
+            # Release the failed batch's write lock before teardown
+            conn.rollback()
+            conn.close()
+
 
     class TestGetLabelsForMap:
         """
@@ -129,4 +162,23 @@ class TestLabels:
                     label,
                     x,
                     y
-                )
\ No newline at end of file
+                )
+
+
+    class TestAssignNearestLabels:
+        """Contains tests for the labels.assign_nearest_labels() method"""
+        def test_assigns_each_icon_its_closest_label(self):
+            labels_xy = [(label.x, label.y) for label in VALID_LABELS[:2]]
+
+            # Place one icon right beside each of the two labels
+            icons_xy = [
+                (labels_xy[1][0] - 0.01, labels_xy[1][1]),
+                (labels_xy[0][0], labels_xy[0][1] + 0.01)
+            ]
+
+            nearest = data.labels.assign_nearest_labels(icons_xy, labels_xy)
+            assert list(nearest) == [1, 0]
+
+        def test_raises_exception_when_given_no_labels(self):
+            with pytest.raises(ValueError):
+                data.labels.assign_nearest_labels([(0.5, 0.5)], [])
@@ -30,17 +30,18 @@ def _does_map_exist(
     Returns:
         bool: Whether or not a row exists for the given map and war
     """        
+    # The maps primary key covers both columns, so this
+    # finds the one row (if any) without a scan
     sql = """
-        SELECT * 
+        SELECT 1
         FROM maps 
         WHERE 
             map_name = ?
             AND war_number = ?
+        LIMIT 1
     """
     params = (map_name, war_num)
-    cursor = conn.cursor()
-    results = cursor.execute(sql, params).fetchall()
-    return len(results) > 0
+    return conn.execute(sql, params).fetchone() is not None
 
 
 class TestMaps:
@@ -58,6 +59,7 @@ class TestMaps:
             map_name = VALID_MAPS[0][0]
             war_number = VALID_MAPS[0][1]
             data.maps.insert_map(map_name, war_number, conn)
+            conn.commit()
 
             assert _does_map_exist(map_name, war_number, conn) == True
 
@@ -73,9 +75,27 @@ class TestMaps:
             map_name = "NewMapHex"
             war_number = VALID_MAPS[0][1]
             data.maps.insert_map(map_name, war_number, conn)
+            conn.commit()
+
             maps_in_db = data.maps.select_latest_maps(conn)
             assert (map_name, war_number) in maps_in_db
     
+    class TestInsertMaps:
+        """Contains tests for the maps.insert_maps() function"""
+        def test_inserts_many_new_maps(
+                self,
+                valid_war_fixture: valid_war_fixture):
+            """
+            Creates every valid map row in one call, then makes
+            sure that each of them exists.
+            """
+            conn = valid_war_fixture.get_connection()
+            data.maps.insert_maps(VALID_MAPS, conn)
+            conn.commit()
+
+            for map_name, war_number in VALID_MAPS:
+                assert _does_map_exist(map_name, war_number, conn) == True
+
     class TestSelectLatestMaps:
         """Contains tests for the maps.select_latest_maps() function"""
         def tests_raises_when_table_empty(self, valid_war_fixture):
@@ -105,6 +125,7 @@ class TestMaps:
             conn = valid_maps_fixture.get_connection()
             for map_name, war_num in new_maps:
                 data.maps.insert_map(map_name, war_num, conn)
+            conn.commit()
 
             # Get the latest war list and assert equal to the new_maps list
             results = data.maps.select_latest_maps(conn)
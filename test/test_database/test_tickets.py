@@ -72,6 +72,7 @@ class TestInsertTicket:
         # Create a valid imaginary ticket with a specified origin
         ticket = VALID_TICKETS[1]
         ticket_id = data.tickets.insert_ticket(ticket, conn)
+        conn.commit()
 
         # Assert the ticket ID returns data
         assert data.tickets.select_ticket(ticket_id, conn) == ticket
@@ -84,6 +85,7 @@ class TestInsertTicket:
         # Create a valid imaginary ticket without an origin
         ticket = VALID_TICKETS[0]
         ticket_id = data.tickets.insert_ticket(ticket, conn)
+        conn.commit()
 
         # Assert the ticket ID returns data
         assert data.tickets.select_ticket(ticket_id, conn) == ticket
@@ -116,6 +118,7 @@ class TestInsertTicket:
 
         # Ensure it inserts without issue
         ticket_id = data.tickets.insert_ticket(ticket, conn)
+        conn.commit()
 
         assert \
             data.tickets.select_ticket(ticket_id, conn).destination_description \
@@ -173,11 +176,98 @@ class TestInsertTicket:
             )
 
 
+    def test_raises_exception_for_map_from_past_war(
+        self,
+        valid_labels_fixture
+    ):
+        """
+        Assures it raises an exception for a map which only exists in an
+        earlier war than the current one.
+        """
+        conn = valid_labels_fixture.get_connection()
+        data.maps.insert_map("PastWarHex", VALID_WAR.war_number - 1, conn)
+        conn.commit()
+
+        ticket_with_past_map = Ticket(
+            VALID_TICKETS[0].war_number,
+            "PastWarHex",
+            *VALID_TICKETS[0][2:]
+        )
+
+        with pytest.raises(
+                data.tickets.MapDoesNotExistInCurrentWarException):
+            ticket_id = data.tickets.insert_ticket(
+                ticket_with_past_map,
+                conn
+            )
+
+
+class TestInsertTickets:
+    def test_inserts_tickets_with_and_without_origin(self, valid_labels_fixture):
+        """Assures it inserts a batch mixing both shapes of ticket"""
+        conn = valid_labels_fixture.get_connection()
+
+        data.tickets.insert_tickets(VALID_TICKETS, conn)
+        conn.commit()
+
+        rows = conn.execute(
+            "SELECT ticket_number FROM tickets ORDER BY created_on"
+        ).fetchall()
+        assert [data.tickets.select_ticket(row[0], conn) for row in rows] \
+            == VALID_TICKETS
+
+    def test_inserts_partial_origin_ticket_without_origin(
+        self,
+        valid_labels_fixture
+    ):
+        """
+        Assures a ticket with only part of an origin is batched with the
+        origin-less tickets, and so stored without any origin at all.
+        """
+        conn = valid_labels_fixture.get_connection()
+
+        partial_origin_ticket = VALID_TICKETS[1]._replace(
+            origin_y=None,
+            origin_description=None
+        )
+        data.tickets.insert_tickets([partial_origin_ticket], conn)
+        conn.commit()
+
+        ticket_number = conn.execute(
+            "SELECT MAX(ticket_number) FROM tickets"
+        ).fetchone()[0]
+        assert data.tickets.select_ticket(ticket_number, conn) \
+            == partial_origin_ticket._replace(origin_map_name=None, origin_x=None)
+
+    def test_inserts_nothing_when_any_ticket_is_invalid(
+        self,
+        valid_labels_fixture
+    ):
+        """Assures one bad ticket keeps the whole batch out of the table"""
+        conn = valid_labels_fixture.get_connection()
+
+        ticket_with_fake_map = Ticket(
+            VALID_TICKETS[0].war_number,
+            "NonsenseFakeHex",
+            *VALID_TICKETS[0][2:]
+        )
+
+        with pytest.raises(data.tickets.MapDoesNotExistException):
+            data.tickets.insert_tickets(
+                [VALID_TICKETS[1], ticket_with_fake_map],
+                conn
+            )
+
+        assert conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0] == 0
+        conn.rollback()
+
+
 class TestSelectTicket:
     def test_select_ticket_with_origin_which_exists(self, valid_labels_fixture):
         conn = valid_labels_fixture.get_connection()
 
         ticket_id = data.tickets.insert_ticket(VALID_TICKETS[1], conn)
+        conn.commit()
 
         assert data.tickets.select_ticket(ticket_id, conn) == VALID_TICKETS[1]
 
@@ -188,6 +278,7 @@ class TestSelectTicket:
         conn = valid_labels_fixture.get_connection()
 
         ticket_id = data.tickets.insert_ticket(VALID_TICKETS[0], conn)
+        conn.commit()
 
         assert data.tickets.select_ticket(ticket_id, conn) == VALID_TICKETS[0]
 
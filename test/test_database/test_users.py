@@ -1,3 +1,6 @@
+import pytest
+
+from src import db as data
 from fixtures import database_fixture
 from test_data import \
     VALID_USER_TEAMSTER, \
@@ -5,3 +8,57 @@ from test_data import \
     VALID_USER_SUPERVISOR, \
     VALID_USER_ADMIN
 
+
+
+
+class TestUsers:
+    """Contains tests for methods pertaining to the 'users' table of the DB."""
+    class TestInsertUserRoleOnServer:
+        """Contains tests for the users.insert_user_role_on_server() function"""
+        def test_replaces_existing_role(self, database_fixture):
+            """
+            Gives a user a role, then a different one on the same server,
+            and makes sure that only the newer role is kept.
+            """
+            conn = database_fixture.get_connection()
+            data.users.insert_user_role_on_server(VALID_USER_TEAMSTER, conn)
+            promoted = VALID_USER_TEAMSTER._replace(role=data.users.Role.ADMIN)
+            data.users.insert_user_role_on_server(promoted, conn)
+            conn.commit()
+
+            assert data.users.select_user_role_on_server(
+                promoted.user_id, promoted.guild, conn) == promoted.role
+            assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
+
+    class TestSelectUserRoleOnServer:
+        """Contains tests for the users.select_user_role_on_server() function"""
+        def test_selects_each_role_inserted(self, database_fixture):
+            """
+            Inserts a user with each role, then makes sure that every
+            one of them reads back as the same enum member.
+            """
+            conn = database_fixture.get_connection()
+            users = [
+                VALID_USER_TEAMSTER,
+                VALID_USER_SUBMITTER,
+                VALID_USER_SUPERVISOR,
+                VALID_USER_ADMIN
+            ]
+            for user in users:
+                data.users.insert_user_role_on_server(user, conn)
+            conn.commit()
+
+            for user_id, guild, role in users:
+                assert data.users.select_user_role_on_server(
+                    user_id, guild, conn) == role
+
+        def test_raises_exception_for_unknown_user(self, database_fixture):
+            """Makes sure a user with no role on record raises."""
+            conn = database_fixture.get_connection()
+
+            with pytest.raises(data.UniqueRowNotFoundException):
+                data.users.select_user_role_on_server(
+                    VALID_USER_TEAMSTER.user_id,
+                    VALID_USER_TEAMSTER.guild,
+                    conn
+                )
@@ -1,4 +1,5 @@
 import pytest
+import asyncio
 import datetime
 
 from src import db as data
@@ -14,7 +15,7 @@ from test_data import VALID_WAR
 def test_inserts_valid_war_into_empty_table(database_fixture):
     """Causes no issue when inserting a valid war into an empty table."""
     conn = database_fixture.get_connection()
-    data.wars.insert_war(*VALID_WAR, conn)
+    data.wars.insert_war(VALID_WAR.war_number, VALID_WAR.pulled_on, conn)
     conn.commit()
 
     new_war = War(*data.wars.select_latest_war(conn))
@@ -30,11 +31,46 @@ def test_inserts_newer_war_into_occupied_table(valid_war_fixture):
         war_number=VALID_WAR.war_number + 1,
         pulled_on=VALID_WAR.pulled_on + datetime.timedelta(days=30)
     )
-    data.wars.insert_war(*newer_war, conn)
+    data.wars.insert_war(newer_war.war_number, newer_war.pulled_on, conn)
     conn.commit()
 
     assert War(*data.wars.select_latest_war(conn)) == newer_war
 
+def test_keeps_etag_of_latest_war(valid_war_fixture):
+    """Returns the ETag a war was inserted with alongside the war itself."""
+    conn = valid_war_fixture.get_connection()
+    newer_war = War(
+        war_number=VALID_WAR.war_number + 1,
+        pulled_on=VALID_WAR.pulled_on + datetime.timedelta(days=30),
+        etag='"abc123"'
+    )
+    data.wars.insert_war(
+        newer_war.war_number,
+        newer_war.pulled_on,
+        conn,
+        etag=newer_war.etag
+    )
+    conn.commit()
+
+    assert data.wars.select_latest_war(conn).etag == '"abc123"'
+
+def test_inserts_war_without_etag(database_fixture):
+    """Accepts a war with no ETag, given just its number, date, and conn."""
+    conn = database_fixture.get_connection()
+    data.wars.insert_war(VALID_WAR.war_number, VALID_WAR.pulled_on, conn)
+    conn.commit()
+
+    assert data.wars.select_latest_war(conn).etag is None
+
+def test_updates_etag_of_existing_war(valid_war_fixture):
+    """Replaces the ETag kept for a war without touching the war itself."""
+    conn = valid_war_fixture.get_connection()
+    data.wars.update_war_etag(VALID_WAR.war_number, '"def456"', conn)
+    conn.commit()
+
+    war = data.wars.select_latest_war(conn)
+    assert war == VALID_WAR._replace(etag='"def456"')
+
 def test_raises_exception_when_given_same_war(valid_war_fixture):
     """
     Raises a UniqueRowAlreadyExistsException when told to insert
@@ -42,7 +78,7 @@ def test_raises_exception_when_given_same_war(valid_war_fixture):
     """
     conn = valid_war_fixture.get_connection()
     with pytest.raises(UniqueRowAlreadyExistsException):
-        data.wars.insert_war(*VALID_WAR, conn)
+        data.wars.insert_war(VALID_WAR.war_number, VALID_WAR.pulled_on, conn)
 
 def test_raises_exception_when_given_older_war(valid_war_fixture):
     """
@@ -55,4 +91,38 @@ def test_raises_exception_when_given_older_war(valid_war_fixture):
         pulled_on=VALID_WAR.pulled_on - datetime.timedelta(days=30)
     )
     with pytest.raises(NewerWarAlreadyExistsException):
-        data.wars.insert_war(*older_war, conn)
\ No newline at end of file
+        data.wars.insert_war(older_war.war_number, older_war.pulled_on, conn)
+
+def test_selects_latest_war_from_async_code(valid_war_fixture):
+    """
+    Returns the same latest war when select_latest_war is run on a
+    pooled connection through DB.run_read as when it's called directly.
+    """
+    war = asyncio.run(valid_war_fixture.run_read(data.wars.select_latest_war))
+    valid_war_fixture.get_pool().close()
+
+    conn = valid_war_fixture.get_connection()
+    assert war == data.wars.select_latest_war(conn)
+    conn.close()
+
+def test_latest_war_matches_select_latest_war(valid_war_fixture):
+    """Returns the same war as a direct select, both fresh and remembered."""
+    conn = valid_war_fixture.get_connection()
+    expected = data.wars.select_latest_war(conn)
+
+    assert data.wars.latest_war(conn) == expected
+    assert data.wars.latest_war(conn) == expected
+
+def test_latest_war_is_forgotten_when_a_war_is_inserted(valid_war_fixture):
+    """Picks up a newly inserted war rather than the one it remembered."""
+    conn = valid_war_fixture.get_connection()
+    data.wars.latest_war(conn)
+
+    newer_war = War(
+        war_number=VALID_WAR.war_number + 1,
+        pulled_on=VALID_WAR.pulled_on + datetime.timedelta(days=30)
+    )
+    data.wars.insert_war(newer_war.war_number, newer_war.pulled_on, conn)
+    conn.commit()
+
+    assert data.wars.latest_war(conn).war_number == newer_war.war_number
@@ -1,3 +1,5 @@
+import asyncio
+import datetime
 import pytest
 import sqlite3
 
@@ -20,7 +22,7 @@ def test_db_teardown():
     # Spin up a connection and execute the drop_it_all
     # script from the test_database package on the
     # designated test database file.
-    conn = sqlite3.connect(TEST_DB_CONN_STRING)
+    conn = sqlite3.connect(TEST_DB_CONN_STRING, uri=True)
     cursor = conn.cursor()
     cursor.executescript(drop_it_all_sql)
     conn.commit()
@@ -33,7 +35,7 @@ class TestInitialization:
         initialization.execute_cold_start(TEST_DB_CONN_STRING)
         
         # Get a connection to the provided test DB
-        conn = sqlite3.connect(TEST_DB_CONN_STRING)
+        conn = sqlite3.connect(TEST_DB_CONN_STRING, uri=True)
 
         # Assure each of the tables exists and is non-empty
         assert data.wars.select_latest_war(conn) is not None
@@ -44,3 +46,105 @@ class TestInitialization:
         assert len(data.labels.select_latest_labels_for_map(maps[0], conn)) > 0
         assert len(data.icons.get_latest_icons_for_map(maps[0], conn)) > 0
     
+
+class TestSelectLatestWarIfAny:
+    """
+    Contains methods for testing how the cold start reads the latest war,
+    before the database's schema is known to exist or be up to date
+    """
+    def test_returns_none_without_wars_table(self):
+        """Treats a database with no schema yet as having no wars"""
+        conn = sqlite3.connect(":memory:")
+
+        assert initialization._select_latest_war_if_any(conn) is None
+
+    def test_reads_wars_table_without_etag(self):
+        """Reads the latest war from a table made before wars had ETags"""
+        conn = sqlite3.connect(":memory:")
+        conn.execute(
+            "CREATE TABLE wars (war_number INTEGER, last_fetched_on INTEGER)")
+        conn.execute("INSERT INTO wars VALUES (9, 0), (10, 0)")
+
+        war = initialization._select_latest_war_if_any(conn)
+
+        assert war.war_number == 10
+        assert war.etag is None
+
+    def test_raises_when_database_is_locked(self, tmp_path):
+        """Raises any other error, rather than reporting that there's no war"""
+        path = str(tmp_path / "locked.db")
+        locker = sqlite3.connect(path)
+        locker.execute("CREATE TABLE wars (war_number INTEGER)")
+        locker.commit()
+        locker.execute("BEGIN EXCLUSIVE")
+
+        conn = sqlite3.connect(path, timeout=0)
+        with pytest.raises(sqlite3.OperationalError):
+            initialization._select_latest_war_if_any(conn)
+
+        locker.rollback()
+        locker.close()
+        conn.close()
+
+class TestFetchWar:
+    """
+    Contains methods for testing initialization.fetch_war() offline, with
+    a stubbed /war request
+    """
+    latest_war = data.War(10, datetime.datetime(2024, 1, 1), '"v1"')
+
+    def test_returns_none_when_war_not_modified(self, monkeypatch):
+        """Returns None when the API answers that /war hasn't changed"""
+        sent = []
+        monkeypatch.setattr(
+            initialization.api,
+            "get_war_if_modified",
+            lambda etag: sent.append(etag)
+        )
+
+        assert initialization.fetch_war(self.latest_war) is None
+        assert sent == ['"v1"']
+
+    def test_keeps_new_etag_for_same_war(self, monkeypatch):
+        """Returns only the war, with its new ETag, when the war is the same"""
+        pulled_on = datetime.datetime(2024, 1, 2)
+        monkeypatch.setattr(
+            initialization.api,
+            "get_war_if_modified",
+            lambda etag: (10, pulled_on, '"v2"')
+        )
+
+        update = initialization.fetch_war(self.latest_war)
+
+        assert update.war == data.War(10, pulled_on, '"v2"')
+        assert update.maps is None
+
+    def test_can_be_awaited_in_running_loop(self, monkeypatch):
+        """Fetches on the caller's event loop when awaited as fetch_war_async"""
+        pulled_on = datetime.datetime(2024, 1, 2)
+        monkeypatch.setattr(
+            initialization.api,
+            "get_war_if_modified",
+            lambda etag: (10, pulled_on, '"v2"')
+        )
+
+        async def fetch_in_loop():
+            return await initialization.fetch_war_async(self.latest_war)
+
+        update = asyncio.run(fetch_in_loop())
+
+        assert update.war == data.War(10, pulled_on, '"v2"')
+
+    def test_writes_new_etag_for_same_war(self):
+        """Updates the ETag of the war on record, inserting nothing else"""
+        database = data.DB(":memory:")
+        conn = database.get_connection()
+        database.generate_db_from_conn(conn)
+        data.wars.insert_war(*self.latest_war[:2], conn, etag='"v1"')
+
+        update = initialization.WarUpdate(
+            self.latest_war._replace(etag='"v2"'), None, None, None)
+        initialization.write_war(update, conn)
+
+        assert data.wars.select_latest_war(conn).etag == '"v2"'
+        conn.close()
@@ -1,4 +1,8 @@
+import asyncio
+import importlib
+import msgspec
 import pytest
+import requests
 
 #import src.warAPI.get_icons
 #import src.warAPI.get_labels
@@ -21,6 +25,62 @@ class TestGetWar:
         assert 0 < war_num
         assert war_num < 1000
 
+class _FakeResponse:
+    """Stands in for a requests.Response from the War API"""
+    def __init__(self, status_code: int, content: bytes = b"", etag=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {"ETag": etag} if etag else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+class _FakeSession:
+    """
+    Stands in for the shared requests session, answering every GET with a
+    fixed response and recording the headers it was sent
+    """
+    def __init__(self, response: _FakeResponse):
+        self.response = response
+        self.sent_headers = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.sent_headers.append(headers)
+        return self.response
+
+class TestGetWarIfModified:
+    """
+    Contains methods for testing the warAPI.get_war_if_modified() method
+    offline, against a stubbed requests session
+    """
+    def test_returns_none_when_not_modified(self, monkeypatch):
+        """Returns None for a 304, having sent the given ETag"""
+        session = _FakeSession(_FakeResponse(304))
+        monkeypatch.setattr(
+            importlib.import_module(".get_war", api.__name__),
+            "requests_session",
+            session
+        )
+
+        assert api.get_war_if_modified('"v1"') is None
+        assert session.sent_headers == [{"If-None-Match": '"v1"'}]
+
+    def test_returns_war_and_new_etag(self, monkeypatch):
+        """Returns the war number and the response's ETag for a 200"""
+        session = _FakeSession(
+            _FakeResponse(200, b'{"warNumber": 110}', etag='"v2"'))
+        monkeypatch.setattr(
+            importlib.import_module(".get_war", api.__name__),
+            "requests_session",
+            session
+        )
+
+        war_num, pulled_on, etag = api.get_war_if_modified(None)
+
+        assert (war_num, etag) == (110, '"v2"')
+        assert session.sent_headers == [None]
+
 class TestGetMaps:
     """Contains methods for testing the warAPI.get_maps() method"""
     def tests_gets_maps_correctly(self):
@@ -129,3 +189,305 @@ class TestGetIcons:
         # Check that the flag is in the range of a 6-bit integer (0-64)
         assert 0 <= flags <= 64
     
+
+
+# The response cache module, as the fetchers import it
+cache = importlib.import_module(".cache", api.__name__)
+
+class _FakeClock:
+    """Stands in for time.monotonic, moving only when told to"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestTTLCache:
+    """Contains methods for testing the warAPI.cache.TTLCache class"""
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = _FakeClock()
+        monkeypatch.setattr(cache.time, "monotonic", clock)
+        return clock
+
+    def test_returns_value_until_it_expires(self, clock):
+        """Returns a stored value within its TTL, and None once it's past"""
+        ttl_cache = cache.TTLCache()
+        ttl_cache.set("url", b"body", ttl=30)
+
+        clock.now += 29
+        assert ttl_cache.get("url") == b"body"
+
+        clock.now += 1
+        assert ttl_cache.get("url") is None
+
+    def test_returns_none_for_unknown_key(self, clock):
+        """Returns None for a key which was never stored"""
+        assert cache.TTLCache().get("url") is None
+
+    def test_evicts_expired_entries_before_live_ones(self, clock):
+        """Makes room by dropping expired entries first, when it's full"""
+        ttl_cache = cache.TTLCache(maxsize=2)
+        ttl_cache.set("short", b"1", ttl=1)
+        ttl_cache.set("long", b"2", ttl=100)
+
+        clock.now += 5
+        ttl_cache.set("new", b"3", ttl=100)
+
+        assert ttl_cache.get("long") == b"2"
+        assert ttl_cache.get("new") == b"3"
+
+    def test_evicts_oldest_entry_when_none_expired(self, clock):
+        """Makes room by dropping the oldest entry, when none have expired"""
+        ttl_cache = cache.TTLCache(maxsize=2)
+        ttl_cache.set("first", b"1", ttl=100)
+        ttl_cache.set("second", b"2", ttl=100)
+        ttl_cache.set("third", b"3", ttl=100)
+
+        assert ttl_cache.get("first") is None
+        assert ttl_cache.get("second") == b"2"
+        assert ttl_cache.get("third") == b"3"
+
+    def test_clear_drops_every_entry(self, clock):
+        """Forgets everything it held once cleared"""
+        ttl_cache = cache.TTLCache()
+        ttl_cache.set("url", b"body", ttl=30)
+        ttl_cache.clear()
+
+        assert ttl_cache.get("url") is None
+
+class TestGetCached:
+    """Contains methods for testing the warAPI.cache.get_cached() function"""
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch):
+        monkeypatch.setattr(cache, "_cache", cache.TTLCache())
+
+    def test_reuses_successful_response(self, monkeypatch):
+        """Requests a URL only once while its response is fresh"""
+        session = _FakeSession(_FakeResponse(200, b"body"))
+        monkeypatch.setattr(cache, "requests_session", session)
+
+        assert cache.get_cached("url", 30) == b"body"
+        assert cache.get_cached("url", 30) == b"body"
+        assert len(session.sent_headers) == 1
+
+    def test_raises_for_failed_response(self, monkeypatch):
+        """Raises the HTTP error of a failed response, without caching it"""
+        session = _FakeSession(_FakeResponse(503, b"unavailable"))
+        monkeypatch.setattr(cache, "requests_session", session)
+
+        with pytest.raises(requests.HTTPError):
+            cache.get_cached("url", 30)
+        with pytest.raises(requests.HTTPError):
+            cache.get_cached("url", 30)
+        assert len(session.sent_headers) == 2
+
+class TestFetchCached:
+    """Contains methods for testing the warAPI.cache.fetch_cached() function"""
+    def test_shares_cache_between_requests(self, monkeypatch):
+        """Fetches a URL only once while its response is fresh"""
+        monkeypatch.setattr(cache, "_cache", cache.TTLCache())
+        fetched = []
+
+        async def fake_fetch(session, url):
+            fetched.append(url)
+            return b"body"
+        monkeypatch.setattr(cache, "fetch", fake_fetch)
+
+        async def fetch_twice():
+            return [await cache.fetch_cached(None, "url", 30)
+                    for _ in range(2)]
+
+        assert asyncio.run(fetch_twice()) == [b"body", b"body"]
+        assert fetched == ["url"]
+
+
+# The remaining fetcher modules, whose names warAPI shadows with functions
+endpoints = importlib.import_module(".endpoints", api.__name__)
+schemas = importlib.import_module(".schemas", api.__name__)
+get_war_module = importlib.import_module(".get_war", api.__name__)
+get_maps_module = importlib.import_module(".get_maps", api.__name__)
+get_labels_module = importlib.import_module(".get_labels", api.__name__)
+get_icons_module = importlib.import_module(".get_icons", api.__name__)
+
+# Canned response bodies, trimmed down from real War API responses
+WAR_BODY = b'{"warId": "abc", "warNumber": 110, "winner": "NONE"}'
+MAPS_BODY = b'["TheFingersHex", "DeadLandsHex"]'
+STATIC_BODY = b"""{
+    "regionId": 3,
+    "mapTextItems": [
+        {"text": "Captain's Dread", "x": 0.5, "y": 0.25,
+         "mapMarkerType": "Major"},
+        {"text": "Cavitatis", "x": 0.75, "y": 0.5,
+         "mapMarkerType": "Minor"}
+    ]
+}"""
+DYNAMIC_BODY = b"""{
+    "regionId": 3,
+    "mapItems": [
+        {"teamId": "NONE", "iconType": 27, "x": 0.1, "y": 0.2, "flags": 4},
+        {"teamId": "WARDENS", "iconType": 56, "x": 0.3, "y": 0.4, "flags": 0}
+    ]
+}"""
+
+class TestSchemas:
+    """Contains methods for testing the msgspec schemas and decoders"""
+    def test_decodes_war_number_ignoring_other_fields(self):
+        """Reads warNumber from a /war body, skipping fields it doesn't need"""
+        assert schemas.war_data_decoder.decode(WAR_BODY).warNumber == 110
+
+    def test_decodes_map_names(self):
+        """Reads a /maps body as a list of hex names"""
+        assert schemas.map_names_decoder.decode(MAPS_BODY) \
+            == ["TheFingersHex", "DeadLandsHex"]
+
+    def test_decodes_static_map_labels(self):
+        """Reads every label of a /maps/:mapName/static body"""
+        items = schemas.static_map_data_decoder.decode(STATIC_BODY) \
+            .mapTextItems
+
+        assert items[0] == schemas.MapTextItem(
+            "Captain's Dread", 0.5, 0.25, "Major")
+        assert len(items) == 2
+
+    def test_defaults_to_no_items_when_missing(self):
+        """Treats map data with no item list as having no items"""
+        assert schemas.static_map_data_decoder.decode(b"{}").mapTextItems == []
+        assert schemas.dynamic_map_data_decoder.decode(b"{}").mapItems == []
+
+    def test_raises_for_wrongly_typed_field(self):
+        """Refuses a body whose fields aren't of the expected types"""
+        with pytest.raises(msgspec.ValidationError):
+            schemas.war_data_decoder.decode(b'{"warNumber": "110"}')
+
+class TestParseLabels:
+    """Contains methods for testing the label parsing helpers"""
+    def test_parses_every_label_for_both(self):
+        """Keeps major and minor labels alike when label_type is 'Both'"""
+        labels = get_labels_module._parse_labels(
+            STATIC_BODY, get_labels_module._label_filter("Both"))
+
+        assert labels == [
+            ("Captain's Dread", 0.5, 0.25, "Major"),
+            ("Cavitatis", 0.75, 0.5, "Minor")
+        ]
+
+    @pytest.mark.parametrize(
+        "label_type, expected",
+        [("Major", "Captain's Dread"), ("minor", "Cavitatis")]
+    )
+    def test_filters_labels_by_type(self, label_type, expected):
+        """Keeps only the labels of the given type, whatever its case"""
+        labels = get_labels_module._parse_labels(
+            STATIC_BODY, get_labels_module._label_filter(label_type))
+
+        assert [text for text, x, y, marker in labels] == [expected]
+
+    def test_raises_value_error_for_bad_label_type(self):
+        """Refuses a label_type which isn't Major, Minor, or Both"""
+        with pytest.raises(ValueError):
+            get_labels_module._label_filter("doobie")
+
+    def test_builds_rows_for_insert(self):
+        """Builds (map name, war number, label, x, y) rows for the DB"""
+        rows = get_labels_module._label_rows(
+            "TheFingersHex", 110, STATIC_BODY,
+            get_labels_module._label_filter("Major"))
+
+        assert list(rows) == [
+            ("TheFingersHex", 110, "Captain's Dread", 0.5, 0.25)]
+
+class TestParseIcons:
+    """Contains methods for testing the icon parsing helpers"""
+    def test_parses_icons(self):
+        """Reads (x, y, icon type, flags) off every icon"""
+        assert get_icons_module._parse_icons(DYNAMIC_BODY) \
+            == [(0.1, 0.2, 27, 4), (0.3, 0.4, 56, 0)]
+
+    def test_builds_rows_for_insert(self):
+        """Builds (map name, war number, x, y, type, flags) rows for the DB"""
+        rows = get_icons_module._icon_rows("TheFingersHex", 110, DYNAMIC_BODY)
+
+        assert list(rows) == [
+            ("TheFingersHex", 110, 0.1, 0.2, 27, 4),
+            ("TheFingersHex", 110, 0.3, 0.4, 56, 0)
+        ]
+
+class TestMapURLs:
+    """Contains methods for testing the precomputed per-hex URL tables"""
+    @pytest.fixture(autouse=True)
+    def empty_tables(self, monkeypatch):
+        monkeypatch.setattr(endpoints, "STATIC_URLS", {})
+        monkeypatch.setattr(endpoints, "DYNAMIC_URLS", {})
+
+    def test_precomputes_both_urls_for_each_hex(self):
+        """Fills both URL tables from the configured templates"""
+        api.precompute_map_urls(["TheFingersHex"])
+
+        assert endpoints.STATIC_URLS["TheFingersHex"] \
+            == endpoints._STATIC_TEMPLATE.format(map_name="TheFingersHex")
+        assert endpoints.DYNAMIC_URLS["TheFingersHex"] \
+            == endpoints._DYNAMIC_TEMPLATE.format(map_name="TheFingersHex")
+
+    def test_builds_url_for_hex_not_precomputed(self):
+        """Builds and keeps the URLs of a hex it wasn't given up front"""
+        url = endpoints.static_map_url("DeadLandsHex")
+
+        assert url == endpoints._STATIC_TEMPLATE.format(map_name="DeadLandsHex")
+        assert endpoints.dynamic_map_url("DeadLandsHex") \
+            == endpoints.DYNAMIC_URLS["DeadLandsHex"]
+        assert endpoints.STATIC_URLS["DeadLandsHex"] is url
+
+class TestAsyncFetchers:
+    """
+    Contains methods for testing the *_async fetchers offline, with their
+    requests answered by canned bodies
+    """
+    @pytest.fixture(autouse=True)
+    def canned_responses(self, monkeypatch):
+        """Answers each URL with the canned body for its endpoint"""
+        async def fake_fetch(session, url):
+            if url == endpoints.WAR_URL:
+                return WAR_BODY
+            if url == endpoints.MAPS_URL:
+                return MAPS_BODY
+            if url in endpoints.STATIC_URLS.values():
+                return STATIC_BODY
+            return DYNAMIC_BODY
+
+        monkeypatch.setattr(cache, "_cache", cache.TTLCache())
+        for module in (cache, get_war_module, get_maps_module):
+            monkeypatch.setattr(module, "fetch", fake_fetch)
+
+    def test_gets_war(self):
+        """Returns the war number of the /war body"""
+        war_num, pulled_on = asyncio.run(api.get_war_async(None))
+
+        assert war_num == 110
+        assert pulled_on.tzinfo is not None
+
+    def test_gets_maps(self):
+        """Returns the hex names of the /maps body"""
+        assert asyncio.run(api.get_maps_async(None)) \
+            == ["TheFingersHex", "DeadLandsHex"]
+
+    def test_gets_labels_and_rows(self):
+        """Returns a hex's labels, both as tuples and as rows for the DB"""
+        api.precompute_map_urls(["TheFingersHex"])
+
+        labels = asyncio.run(
+            api.get_labels_async(None, "TheFingersHex", "Minor"))
+        rows = asyncio.run(api.get_labels_for_insert_async(
+            None, "TheFingersHex", 110, "Both"))
+
+        assert labels == [("Cavitatis", 0.75, 0.5, "Minor")]
+        assert len(list(rows)) == 2
+
+    def test_gets_icons_and_rows(self):
+        """Returns a hex's icons, both as tuples and as rows for the DB"""
+        icons = asyncio.run(api.get_icons_async(None, "TheFingersHex"))
+        rows = asyncio.run(
+            api.get_icons_for_insert_async(None, "TheFingersHex", 110))
+
+        assert icons == [(0.1, 0.2, 27, 4), (0.3, 0.4, 56, 0)]
+        assert next(rows) == ("TheFingersHex", 110, 0.1, 0.2, 27, 4)